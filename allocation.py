@@ -0,0 +1,168 @@
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from stock_positions import STOCK_BATCHES_FILE, load_usable_stock
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+NORMS_FILE = "data/stock_norms_calculated.csv"
+PRODUCTS_FILE = "data/distributor_products.csv"
+ALLOCATION_FILE = "data/stock_norms_allocation.csv"
+DISPATCH_PLAN_FILE = "data/dispatch_plan.csv"
+
+DISPATCH_COLUMNS = [
+    'sku', 'product_name', 'client_id', 'stock_norm', 'on_hand', 'gap_to_norm',
+    'sellable_before_expiry', 'requested_qty', 'dispatch_qty', 'shortfall_qty', 'last_updated'
+]
+
+
+# ----------------------------
+# ALLOCATION SOLVER
+# ----------------------------
+def allocate(sku_codes, requested, supply):
+    """Integer dispatch quantities for every (client, sku) request in one pass.
+
+    sku_codes indexes each request into supply (available units per SKU). Fully supplied
+    SKUs get every request; short SKUs are shared in proportion to the requested quantity,
+    rounded down, with the leftover units going to the largest fractional remainders.
+    """
+    n_skus = len(supply)
+    requested = np.asarray(requested, dtype=np.float64)
+    total_requested = np.bincount(sku_codes, weights=requested, minlength=n_skus)
+    supply = np.floor(np.minimum(supply, total_requested))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_ratio = np.where(total_requested > 0, supply / total_requested, 0.0)
+    share = requested * fill_ratio[sku_codes]
+    dispatch = np.floor(share)
+    remainder = share - dispatch
+
+    # Units still to hand out per SKU after rounding down
+    leftover = np.round(supply - np.bincount(sku_codes, weights=dispatch, minlength=n_skus))
+
+    # Only requests with a fractional share in a SKU with leftover units compete for them
+    candidates = np.flatnonzero((remainder > 0) & (leftover[sku_codes] > 0))
+    codes = sku_codes[candidates]
+
+    # Rank candidates within their SKU by fractional remainder (then by size), largest first
+    order = np.lexsort((-requested[candidates], -remainder[candidates], codes))
+    group_start = np.searchsorted(codes[order], np.arange(n_skus))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - group_start[codes[order]]
+
+    dispatch[candidates] += rank < leftover[codes]
+    return dispatch.astype(np.int64)
+
+
+# ----------------------------
+# DISPATCH REQUESTS
+# ----------------------------
+def remaining_shelf_days(supply_df, products_df, as_of):
+    """Days until the stock being dispatched expires, per SKU.
+
+    Taken from the supply's shelf_life_days or expiry_date where given; otherwise the stock
+    is assumed fresh with the product's min_shelf_life, the conservative end of its range.
+    """
+    supply_df = supply_df.reindex(pd.Index(products_df['sku'], name='sku'))
+    days = pd.Series(np.nan, index=supply_df.index)
+    if 'expiry_date' in supply_df:
+        days = (pd.to_datetime(supply_df['expiry_date'], errors='coerce') - as_of).dt.days
+    if 'shelf_life_days' in supply_df:
+        days = supply_df['shelf_life_days'].fillna(days)
+    fresh = products_df.set_index('sku')['min_shelf_life']
+    return days.fillna(fresh).clip(lower=0).rename('remaining_shelf_days')
+
+
+def build_requests(norms_df, stock_df, products_df, supply_df, as_of):
+    """Requested quantity per (client, sku): the gap to norm, capped by what the client can sell before expiry"""
+    products_df = remaining_shelf_days(supply_df, products_df, as_of).reset_index()
+
+    requests_df = norms_df[['client_id', 'sku', 'product_name', 'stock_norm', 'avg_daily_demand']].merge(
+        stock_df, on=['client_id', 'sku'], how='left'
+    ).merge(
+        products_df[['sku', 'remaining_shelf_days']], on='sku', how='left'
+    )
+    on_hand = requests_df['qty_on_hand'].fillna(0).to_numpy(dtype=np.float64)
+    stock_norm = requests_df['stock_norm'].to_numpy(dtype=np.float64)
+    avg_demand = requests_df['avg_daily_demand'].to_numpy(dtype=np.float64)
+    shelf_days = requests_df['remaining_shelf_days'].fillna(0).to_numpy(dtype=np.float64)
+
+    gap = np.maximum(stock_norm - on_hand, 0)
+    sellable = np.maximum(avg_demand * shelf_days - on_hand, 0)
+
+    requests_df['on_hand'] = on_hand
+    requests_df['gap_to_norm'] = np.round(gap, 2)
+    requests_df['sellable_before_expiry'] = np.round(sellable, 2)
+    requests_df['requested_qty'] = np.floor(np.minimum(gap, sellable)).astype(np.int64)
+    return requests_df.drop(columns=['qty_on_hand', 'avg_daily_demand', 'remaining_shelf_days'])
+
+
+def load_supply(supply_file=None, allocation_file=ALLOCATION_FILE):
+    """Distributor supply per SKU, from a supply file or the current allocation table.
+
+    A supply file has sku,available_qty and optionally shelf_life_days (remaining) or
+    expiry_date of that stock; with several rows per SKU the earliest expiry is kept.
+    """
+    if supply_file:
+        supply_df = pd.read_csv(supply_file)
+        columns = [c for c in ['shelf_life_days', 'expiry_date'] if c in supply_df]
+        return supply_df.groupby('sku').agg(
+            available_qty=('available_qty', 'sum'), **{c: (c, 'min') for c in columns}
+        )
+    allocation_df = pd.read_csv(allocation_file, usecols=['sku', 'allocated_qty'])
+    return allocation_df.groupby('sku').agg(available_qty=('allocated_qty', 'sum'))
+
+
+def plan_dispatch(requests_df, supply, last_updated=None):
+    """Allocate available distributor stock across all requests, returning the dispatch plan"""
+    requests_df = requests_df.sort_values(['sku', 'client_id'], ignore_index=True)
+    sku_codes, skus = pd.factorize(requests_df['sku'], sort=True)
+    available = supply.reindex(skus).fillna(0).to_numpy(dtype=np.float64)
+
+    dispatch = allocate(sku_codes, requests_df['requested_qty'].to_numpy(), available)
+    requests_df['dispatch_qty'] = dispatch
+    requests_df['shortfall_qty'] = requests_df['requested_qty'] - dispatch
+    requests_df['last_updated'] = last_updated or datetime.now().date()
+    return requests_df[DISPATCH_COLUMNS]
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Allocate distributor stock to clients against their stock norms")
+    parser.add_argument('--norms', default=NORMS_FILE, help="Calculated stock norms CSV")
+    parser.add_argument('--batches', default=STOCK_BATCHES_FILE, help="Client stock batches CSV")
+    parser.add_argument('--products', default=PRODUCTS_FILE, help="Distributor products CSV")
+    parser.add_argument('--supply', default=None,
+                        help="CSV of sku,available_qty with optional shelf_life_days or expiry_date of that stock "
+                             "(default: allocated_qty totals from the allocation table, assumed fresh)")
+    parser.add_argument('--allocation', default=ALLOCATION_FILE, help="Current allocation table")
+    parser.add_argument('--as-of', default=None, help="Planning date (default: today)")
+    parser.add_argument('--output', default=DISPATCH_PLAN_FILE, help="Dispatch plan CSV")
+    args = parser.parse_args()
+
+    as_of = pd.Timestamp(args.as_of or datetime.now().date())
+    norms_df = pd.read_csv(args.norms, usecols=['client_id', 'sku', 'product_name', 'stock_norm', 'avg_daily_demand'])
+    stock_df = load_usable_stock(args.batches, as_of)
+    products_df = pd.read_csv(args.products, usecols=['sku', 'min_shelf_life'])
+    supply_df = load_supply(args.supply, args.allocation)
+    print(f"📂 Loaded {len(norms_df)} stock norms and supply for {len(supply_df)} SKUs")
+
+    requests_df = build_requests(norms_df, stock_df, products_df, supply_df, as_of)
+    plan_df = plan_dispatch(requests_df, supply_df['available_qty'], last_updated=as_of.date())
+    plan_df.to_csv(args.output, index=False)
+    print(f"💾 Saved dispatch plan to: {args.output}")
+
+    by_sku = plan_df.groupby('sku')[['requested_qty', 'dispatch_qty']].sum()
+    print(f"\n📊 Dispatch Summary:")
+    print(f"  • Requested units: {plan_df['requested_qty'].sum():,}")
+    print(f"  • Dispatched units: {plan_df['dispatch_qty'].sum():,}")
+    print(f"  • Clients receiving stock: {plan_df.loc[plan_df['dispatch_qty'] > 0, 'client_id'].nunique()}")
+    print(f"  • SKUs short of supply: {(by_sku['dispatch_qty'] < by_sku['requested_qty']).sum()} of {len(by_sku)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ import pandas as pd
 import random
 import os
 from datetime import datetime, timedelta
+from demand_stats import DEMAND_STATS_FILE, DemandStatsStore
 
 # ----------------------------
 # CONFIGURATION
@@ -317,6 +318,10 @@ for client_id, sales_data in sales_by_client.items():
 
 print(f"✔ Created sales files for {len(sales_by_client)} clients")
 
+# Running demand statistics per (client, sku), built once from the new sales files
+demand_stats = DemandStatsStore.build_from_sales("data")
+demand_stats.save(DEMAND_STATS_FILE)
+
 # ----------------------------
 # 5. STOCK NORMS / ALLOCATION TABLE
 # Shows how distributor allocates products to clients
@@ -336,17 +341,12 @@ for _, product in products_df.iterrows():
     if len(clients_with_product) == 0:
         continue
     
-    # Calculate historical average sales per client for this SKU
+    # Historical average sales per client for this SKU, from the demand statistics store
     client_sales_avg = {}
     for cid in clients_with_product:
-        # Read from client-specific sales file
-        client_sales_file = f"data/sales_daily_{cid}.csv"
-        if os.path.exists(client_sales_file):
-            client_sales_df = pd.read_csv(client_sales_file)
-            avg_sales = client_sales_df[client_sales_df["sku"] == sku]["qty_sold"].mean()
-            client_sales_avg[cid] = max(1, avg_sales if not pd.isna(avg_sales) else 1)
-        else:
-            client_sales_avg[cid] = 1  # Default if file doesn't exist
+        client_stats = demand_stats.summary(cid, sku)
+        avg_sales = client_stats['mean'] if client_stats is not None else 1
+        client_sales_avg[cid] = max(1, avg_sales)
     
     total_avg_sales = sum(client_sales_avg.values())
     
@@ -401,6 +401,7 @@ print("  2. distributor_products.csv          - Real Pakistani FMCG brands")
 print("  3. stock_batches.csv                 - Batch-level stock with realistic expiry")
 print(f"  4. sales_daily_C001.csv to C0{NUM_CLIENTS:02d}.csv - Per-client sales history")
 print("  5. stock_norms_allocation.csv        - Distribution allocation norms")
+print("  6. demand_stats.npz                  - Running demand statistics per client/SKU")
 print("\n💡 Realistic Features:")
 print("  • Actual Pakistani brands: Nestle, Unilever, P&G, National, Shan, etc.")
 print("  • Category-specific shelf life (Dairy: 7-30 days, Frozen: 180-365 days)")
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# Syntetos-Boylan segmentation cut-offs
+ADI_CUTOFF = 1.32
+CV2_CUTOFF = 0.49
+
+MIN_HISTORY_ROWS = 14
+
+# Model tiers:
+#   Intermittent -> Croston, Lumpy -> SBA (Syntetos-Boylan approximation)
+#   Smooth / Erratic -> Prophet when there are >= PROPHET_MIN_HISTORY_DAYS of history and the
+#   weekday x holiday profile explains >= PROPHET_MIN_PROFILE_R2 of the daily variance
+#   (adjusted R²), otherwise SMA: a flat moving average already captures structureless demand
+PROPHET_MIN_HISTORY_DAYS = 56
+PROPHET_MIN_PROFILE_R2 = 0.5
+
+SMA_WINDOW_DAYS = 28
+CROSTON_ALPHA = 0.1
+
+# Width of the flat forecast band, matching Prophet's interval_width=0.95
+INTERVAL_Z = 1.96
+
+
+# ----------------------------
+# DAILY DEMAND SERIES
+# ----------------------------
+def daily_demand_series(sales_df, sku):
+    """Daily demand for one SKU between its first and last sale date, missing days filled with 0"""
+    sku_sales = sales_df[sales_df['sku'] == sku]
+    daily = sku_sales.groupby(pd.to_datetime(sku_sales['date']))['qty_sold'].sum()
+
+    date_range = pd.date_range(start=daily.index.min(), end=daily.index.max(), freq='D')
+    daily = daily.reindex(date_range, fill_value=0)
+
+    return pd.DataFrame({'ds': daily.index, 'y': daily.to_numpy()})
+
+
+def build_demand_matrix(sales_df):
+    """Pivot a client's sales into a (sku x day) demand matrix plus a mask of each SKU's active history"""
+    dates = pd.to_datetime(sales_df['date'])
+    daily = sales_df.groupby(['sku', dates])['qty_sold'].sum()
+    n_obs = sales_df.groupby('sku').size()
+
+    recorded = daily.unstack()
+    full_range = pd.date_range(start=recorded.columns.min(), end=recorded.columns.max(), freq='D')
+    recorded = recorded.reindex(columns=full_range)
+
+    demand = recorded.fillna(0).to_numpy(dtype=np.float64)
+    has_record = recorded.notna().to_numpy()
+
+    # Each SKU's history runs from its first to its last recorded date
+    n_days = demand.shape[1]
+    first_day = has_record.argmax(axis=1)
+    last_day = n_days - 1 - has_record[:, ::-1].argmax(axis=1)
+    day_idx = np.arange(n_days)
+    active = (day_idx >= first_day[:, None]) & (day_idx <= last_day[:, None])
+
+    return recorded.index.to_numpy(), demand, active, n_obs.reindex(recorded.index).to_numpy()
+
+
+# ----------------------------
+# CLASSIFICATION
+# ----------------------------
+def profile_r2(demand, active, dates, holiday_dates=None):
+    """Adjusted R² of each SKU's daily demand explained by its weekday (x holiday day) means"""
+    groups = dates.weekday.to_numpy()
+    if holiday_dates is not None:
+        groups = groups + 7 * dates.isin(holiday_dates)
+    onehot = np.eye(14)[groups]
+
+    demand = np.where(active, demand, 0.0)
+    counts = active.astype(np.float64) @ onehot
+    n = active.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = demand.sum(axis=1) / n
+        group_mean = np.where(counts > 0, (demand @ onehot) / counts, 0.0)
+        explained = (counts * (group_mean - mean[:, None]) ** 2).sum(axis=1)
+        total = (np.where(active, demand - mean[:, None], 0.0) ** 2).sum(axis=1)
+        r2 = np.where(total > 0, explained / total, 0.0)
+        n_groups = (counts > 0).sum(axis=1)
+        adjusted = np.where(n > n_groups, 1 - (1 - r2) * (n - 1) / (n - n_groups), 0.0)
+    return adjusted
+
+
+def classify_demand(sales_df, holiday_dates=None):
+    """Classify every SKU of a client by ADI / CV², history length and calendar structure and pick a forecast model tier"""
+    skus, demand, active, n_obs = build_demand_matrix(sales_df)
+    dates = pd.date_range(pd.to_datetime(sales_df['date']).min(), periods=demand.shape[1], freq='D')
+
+    history_days = active.sum(axis=1)
+    nonzero = active & (demand > 0)
+    n_nonzero = nonzero.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Average inter-demand interval
+        adi = np.where(n_nonzero > 0, history_days / n_nonzero, np.inf)
+
+        # Squared coefficient of variation of the non-zero demand sizes
+        sizes = np.where(nonzero, demand, np.nan)
+        size_mean = np.nanmean(sizes, axis=1)
+        size_std = np.nanstd(sizes, axis=1)
+        cv2 = np.where(n_nonzero > 0, (size_std / size_mean) ** 2, 0.0)
+
+    intermittent = adi >= ADI_CUTOFF
+    variable = cv2 >= CV2_CUTOFF
+    demand_pattern = np.select(
+        [~intermittent & ~variable, ~intermittent & variable, intermittent & ~variable],
+        ['Smooth', 'Erratic', 'Intermittent'],
+        default='Lumpy'
+    )
+
+    structure = profile_r2(demand, active, dates, holiday_dates)
+    prophet_ready = (history_days >= PROPHET_MIN_HISTORY_DAYS) & (structure >= PROPHET_MIN_PROFILE_R2)
+    forecast_method = np.select(
+        [n_obs < MIN_HISTORY_ROWS, n_nonzero == 0, intermittent & ~variable, intermittent, prophet_ready],
+        [None, 'SMA', 'Croston', 'SBA', 'Prophet'],
+        default='SMA'
+    )
+
+    return pd.DataFrame({
+        'n_obs': n_obs,
+        'history_days': history_days,
+        'adi': adi,
+        'cv2': cv2,
+        'profile_r2': structure,
+        'demand_pattern': demand_pattern,
+        'forecast_method': forecast_method
+    }, index=pd.Index(skus, name='sku'))
+
+
+# ----------------------------
+# LIGHTWEIGHT FORECASTERS
+# ----------------------------
+def forecast_moving_average(y, window=SMA_WINDOW_DAYS):
+    """Simple moving average over the most recent window of daily demand"""
+    recent = pd.Series(y).iloc[-window:]
+    std_demand = recent.std()
+
+    return {
+        'avg_demand': recent.mean(),
+        'std_demand': 0.0 if pd.isna(std_demand) else std_demand,
+        'forecast_df': None,
+        'historical_avg': pd.Series(y).mean(),
+        'forecast_method': 'SMA'
+    }
+
+
+def _exponential_smoothing(values, alpha):
+    """Final level of simple exponential smoothing, initialised with the first value"""
+    if len(values) == 1:
+        return values[0]
+    smoothed, _ = lfilter([alpha], [1, alpha - 1], values[1:], zi=[(1 - alpha) * values[0]])
+    return smoothed[-1]
+
+
+def forecast_croston(y, alpha=CROSTON_ALPHA, sba=False):
+    """Croston's method for intermittent demand, with the Syntetos-Boylan bias correction when sba=True"""
+    y = np.asarray(y, dtype=np.float64)
+    demand_days = np.flatnonzero(y > 0)
+
+    if len(demand_days) == 0:
+        avg_demand = 0.0
+    else:
+        sizes = y[demand_days]
+        intervals = np.diff(demand_days, prepend=-1).astype(np.float64)
+        avg_demand = _exponential_smoothing(sizes, alpha) / _exponential_smoothing(intervals, alpha)
+        if sba:
+            avg_demand *= 1 - alpha / 2
+
+    std_demand = pd.Series(y).std()
+
+    return {
+        'avg_demand': avg_demand,
+        'std_demand': 0.0 if pd.isna(std_demand) else std_demand,
+        'forecast_df': None,
+        'historical_avg': y.mean(),
+        'forecast_method': 'SBA' if sba else 'Croston'
+    }
+
+
+def flat_forecast_frame(last_date, avg_demand, std_demand, forecast_days):
+    """Daily horizon for the non-Prophet tiers: a constant forecast with a normal 95% band"""
+    ds = pd.date_range(start=pd.Timestamp(last_date) + pd.Timedelta(days=1), periods=forecast_days, freq='D')
+    return pd.DataFrame({
+        'ds': ds,
+        'yhat': avg_demand,
+        'yhat_lower': max(avg_demand - INTERVAL_Z * std_demand, 0),
+        'yhat_upper': avg_demand + INTERVAL_Z * std_demand
+    })
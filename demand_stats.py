@@ -0,0 +1,406 @@
+import argparse
+import io
+import os
+import zlib
+from datetime import date
+import numpy as np
+import pandas as pd
+from demand_classifier import build_demand_matrix
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+DEMAND_STATS_FILE = "data/demand_stats.npz"
+WINDOWS = (7, 28, 90)
+RING_DAYS = max(WINDOWS)
+INITIAL_CAPACITY = 1024
+# Bytes before a sales file's read offset that must be unchanged for new rows to be appended
+SOURCE_CHECK_BYTES = 4096
+
+
+def day_number(value):
+    """Proleptic Gregorian ordinal of a date-like value"""
+    return pd.Timestamp(value).date().toordinal()
+
+
+def sales_file_clients(data_dir="data"):
+    """(client_id, path) of every sales_daily_<client>.csv file, sorted by file name"""
+    sales_files = sorted(f for f in os.listdir(data_dir) if f.startswith("sales_daily_C") and f.endswith(".csv"))
+    return [(f.replace("sales_daily_", "").replace(".csv", ""), os.path.join(data_dir, f)) for f in sales_files]
+
+
+def check_sum(path, offset):
+    """CRC32 of the SOURCE_CHECK_BYTES bytes just before offset"""
+    with open(path, 'rb') as f:
+        f.seek(max(offset - SOURCE_CHECK_BYTES, 0))
+        return zlib.crc32(f.read(min(offset, SOURCE_CHECK_BYTES)))
+
+
+def source_fingerprint(path, offset=None):
+    """(size, mtime_ns, offset, checksum) of a sales file read up to offset (default: all of it)"""
+    stat = os.stat(path)
+    offset = stat.st_size if offset is None else offset
+    return stat.st_size, stat.st_mtime_ns, offset, check_sum(path, offset)
+
+
+def read_appended_sales(path, offset):
+    """Complete sales rows written after offset, and the offset just past them"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        appended = f.read()
+    end = appended.rfind(b'\n') + 1
+    sales_df = pd.read_csv(io.BytesIO(header + appended[:end]), usecols=['date', 'sku', 'qty_sold'])
+    return sales_df, offset + end
+
+
+# ----------------------------
+# STATISTICS STORE
+# ----------------------------
+class DemandStatsStore:
+    """Running daily-demand statistics per (client, sku), updated in O(1) per new day.
+
+    Per series it keeps the day count, mean and M2 (Welford), the last RING_DAYS daily
+    values with 7/28/90-day sums, and per-weekday sums and counts. Days between two
+    recorded sales count as zero demand, matching the reindexed history used for forecasting.
+
+    sources holds a fingerprint per client sales file (size, mtime, bytes read and a checksum
+    of the bytes before that offset), so a sync only reads rows appended since the last one.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.rows = {}
+        self.keys = []
+        self.size = 0
+        self.sources = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros(capacity)
+        self.m2 = np.zeros(capacity)
+        self.first_day = np.zeros(capacity, dtype=np.int64)
+        self.last_day = np.zeros(capacity, dtype=np.int64)
+        self.ring = np.zeros((capacity, RING_DAYS))
+        self.window_sums = np.zeros((capacity, len(WINDOWS)))
+        self.weekday_sum = np.zeros((capacity, 7))
+        self.weekday_count = np.zeros((capacity, 7), dtype=np.int64)
+
+    def _arrays(self):
+        return ['count', 'mean', 'm2', 'first_day', 'last_day', 'ring', 'window_sums', 'weekday_sum', 'weekday_count']
+
+    def _row(self, key):
+        """Row for a key, adding an empty series (with amortised array growth) if it is new"""
+        row = self.rows.get(key)
+        if row is not None:
+            return row
+        if self.size == len(self.count):
+            for name in self._arrays():
+                old = getattr(self, name)
+                grown = np.zeros((2 * len(old),) + old.shape[1:], dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        row = self.size
+        self.rows[key] = row
+        self.keys.append(key)
+        self.size += 1
+        return row
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    # ----------------------------
+    # INCREMENTAL UPDATES
+    # ----------------------------
+    def _push_day(self, row, day, value):
+        """Advance the ring buffer and window sums by one day"""
+        for i, window in enumerate(WINDOWS):
+            leaving_day = day - window
+            if leaving_day >= self.first_day[row]:
+                self.window_sums[row, i] -= self.ring[row, leaving_day % RING_DAYS]
+            self.window_sums[row, i] += value
+        self.ring[row, day % RING_DAYS] = value
+
+    def _add_zero_days(self, row, start_day, n_days):
+        """Account for n_days days without sales starting at start_day"""
+        n = self.count[row]
+        total = n + n_days
+        delta = -self.mean[row]
+        self.mean[row] += delta * n_days / total
+        self.m2[row] += delta ** 2 * n * n_days / total
+        self.count[row] = total
+
+        full_weeks, remainder = divmod(n_days, 7)
+        self.weekday_count[row] += full_weeks
+        for offset in range(remainder):
+            self.weekday_count[row, date.fromordinal(start_day + offset).weekday()] += 1
+
+        if n_days >= RING_DAYS:
+            self.ring[row] = 0
+            self.window_sums[row] = 0
+        else:
+            for offset in range(n_days):
+                self._push_day(row, start_day + offset, 0.0)
+
+    def _add_value(self, row, day, value):
+        n = self.count[row] + 1
+        delta = value - self.mean[row]
+        self.mean[row] += delta / n
+        self.m2[row] += delta * (value - self.mean[row])
+        self.count[row] = n
+
+        weekday = date.fromordinal(day).weekday()
+        self.weekday_sum[row, weekday] += value
+        self.weekday_count[row, weekday] += 1
+        self._push_day(row, day, value)
+
+    def _increase_last_value(self, row, day, extra):
+        """Add more demand to the series' latest day (several sale records on one date)"""
+        old = self.ring[row, day % RING_DAYS]
+        new = old + extra
+
+        # Welford: swap the old value for the new one
+        n = self.count[row]
+        mean = self.mean[row]
+        new_mean = mean + (new - old) / n
+        self.m2[row] += (new - old) * (new - new_mean + old - mean)
+        self.mean[row] = new_mean
+
+        self.weekday_sum[row, date.fromordinal(day).weekday()] += extra
+        self.window_sums[row] += extra
+        self.ring[row, day % RING_DAYS] = new
+
+    def update(self, client_id, sku, sale_date, qty):
+        """Record qty sold for (client_id, sku) on sale_date; dates must not go backwards"""
+        row = self._row((client_id, sku))
+        day = day_number(sale_date)
+        qty = float(qty)
+
+        if self.count[row] == 0:
+            self.first_day[row] = day
+        else:
+            last_day = self.last_day[row]
+            if day < last_day:
+                raise ValueError(f"Out-of-order sale for {(client_id, sku)}: {sale_date}")
+            if day == last_day:
+                self._increase_last_value(row, day, qty)
+                return
+            if day > last_day + 1:
+                self._add_zero_days(row, last_day + 1, day - last_day - 1)
+
+        self._add_value(row, day, qty)
+        self.last_day[row] = day
+
+    def append_sales(self, sales_df):
+        """Apply new sales records (client_id, sku, date, qty_sold) in date order"""
+        daily = sales_df.groupby(['date', 'client_id', 'sku'], sort=True)['qty_sold'].sum()
+        for (sale_date, client_id, sku), qty in daily.items():
+            self.update(client_id, sku, sale_date, qty)
+        return len(daily)
+
+    # ----------------------------
+    # QUERIES
+    # ----------------------------
+    def summary(self, client_id, sku):
+        """Current statistics for one series, or None if it has no history"""
+        row = self.rows.get((client_id, sku))
+        if row is None:
+            return None
+        n = self.count[row]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weekday_profile = self.weekday_sum[row] / self.weekday_count[row]
+        result = {
+            'count': int(n),
+            'mean': self.mean[row],
+            'std': np.sqrt(self.m2[row] / (n - 1)) if n > 1 else np.nan,
+            'last_date': date.fromordinal(int(self.last_day[row])),
+            'weekday_profile': weekday_profile
+        }
+        for i, window in enumerate(WINDOWS):
+            result[f'avg_{window}d'] = self.window_sums[row, i] / min(window, n)
+        return result
+
+    def to_frame(self):
+        """Summary statistics for every series as a DataFrame"""
+        n = self.count[:self.size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frame = pd.DataFrame({
+                'client_id': [key[0] for key in self.keys],
+                'sku': [key[1] for key in self.keys],
+                'days': n,
+                'mean': self.mean[:self.size],
+                'std': np.where(n > 1, np.sqrt(self.m2[:self.size] / (n - 1)), np.nan),
+                'last_date': [date.fromordinal(int(day)) for day in self.last_day[:self.size]]
+            })
+            for i, window in enumerate(WINDOWS):
+                frame[f'avg_{window}d'] = self.window_sums[:self.size, i] / np.minimum(window, n)
+            weekday_means = self.weekday_sum[:self.size] / self.weekday_count[:self.size]
+        for weekday, name in enumerate(['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']):
+            frame[f'avg_{name}'] = weekday_means[:, weekday]
+        return frame
+
+    # ----------------------------
+    # BULK BUILD AND PERSISTENCE
+    # ----------------------------
+    @classmethod
+    def build_from_sales(cls, data_dir="data"):
+        """Build the store from every client's full daily sales history in one vectorised pass per client"""
+        store = cls()
+        for client_id, path in sales_file_clients(data_dir):
+            fingerprint = source_fingerprint(path)
+            sales_df = pd.read_csv(path, usecols=['date', 'sku', 'qty_sold'])
+            if len(sales_df) > 0:
+                store._add_history(client_id, sales_df)
+            store.sources[client_id] = fingerprint
+        return store
+
+    def _add_history(self, client_id, sales_df):
+        skus, demand, active, _ = build_demand_matrix(sales_df)
+        start_day = day_number(pd.to_datetime(sales_df['date']).min())
+        n_days = demand.shape[1]
+        demand = np.where(active, demand, 0.0)
+
+        count = active.sum(axis=1)
+        mean = demand.sum(axis=1) / count
+        m2 = (np.where(active, demand - mean[:, None], 0.0) ** 2).sum(axis=1)
+        first_col = active.argmax(axis=1)
+        last_col = n_days - 1 - active[:, ::-1].argmax(axis=1)
+
+        # Last RING_DAYS days of each series, stored at slot (day % RING_DAYS)
+        offsets = np.arange(RING_DAYS)
+        cols = last_col[:, None] - offsets[None, :]
+        valid = cols >= first_col[:, None]
+        values = np.where(valid, demand[np.arange(len(skus))[:, None], np.maximum(cols, 0)], 0.0)
+        slots = (start_day + cols) % RING_DAYS
+
+        weekday_onehot = np.eye(7)[(date.fromordinal(start_day).weekday() + np.arange(n_days)) % 7]
+
+        rows = np.array([self._row((client_id, sku)) for sku in skus])
+        self.count[rows] = count
+        self.mean[rows] = mean
+        self.m2[rows] = m2
+        self.first_day[rows] = start_day + first_col
+        self.last_day[rows] = start_day + last_col
+        self.ring[rows] = 0
+        self.ring[rows[:, None], slots] = values
+        for i, window in enumerate(WINDOWS):
+            self.window_sums[rows, i] = values[:, :window].sum(axis=1)
+        self.weekday_sum[rows] = demand @ weekday_onehot
+        self.weekday_count[rows] = active.astype(np.int64) @ weekday_onehot.astype(np.int64)
+
+    def save(self, path=DEMAND_STATS_FILE):
+        arrays = {name: getattr(self, name)[:self.size] for name in self._arrays()}
+        np.savez(
+            path,
+            client_id=np.array([key[0] for key in self.keys], dtype=str),
+            sku=np.array([key[1] for key in self.keys], dtype=str),
+            source_client=np.array(list(self.sources), dtype=str),
+            source_fingerprint=np.array(list(self.sources.values()), dtype=np.int64).reshape(-1, 4),
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, path=DEMAND_STATS_FILE):
+        with np.load(path) as data:
+            store = cls(capacity=max(len(data['count']), 1))
+            store.keys = list(zip(data['client_id'].tolist(), data['sku'].tolist()))
+            store.rows = {key: row for row, key in enumerate(store.keys)}
+            store.size = len(store.keys)
+            for name in store._arrays():
+                getattr(store, name)[:store.size] = data[name]
+            if 'source_client' in data:
+                store.sources = {
+                    client_id: tuple(int(value) for value in fingerprint)
+                    for client_id, fingerprint in zip(data['source_client'].tolist(), data['source_fingerprint'])
+                }
+        return store
+
+    def sync_with_sales(self, data_dir="data"):
+        """Bring the store up to date with the sales files.
+
+        Files whose size and mtime match their fingerprint are skipped without reading them.
+        A file that grew with the bytes before its read offset unchanged has only its new rows
+        read and appended; anything else (a client added or removed, a file rewritten or new
+        rows dated before the store's last day) rebuilds the store.
+        Returns the synced store and whether it changed.
+        """
+        sales_files = sales_file_clients(data_dir)
+        if set(self.sources) != {client_id for client_id, _ in sales_files}:
+            return self.build_from_sales(data_dir), True
+
+        changed = False
+        for client_id, path in sales_files:
+            size, mtime_ns, offset, checksum = self.sources[client_id]
+            stat = os.stat(path)
+            if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                continue
+            if stat.st_size < offset or check_sum(path, offset) != checksum:
+                return self.build_from_sales(data_dir), True
+
+            new_sales, offset = read_appended_sales(path, offset)
+            try:
+                self.append_sales(new_sales.assign(client_id=client_id))
+            except ValueError:
+                return self.build_from_sales(data_dir), True
+            self.sources[client_id] = source_fingerprint(path, offset)
+            changed = True
+        return self, changed
+
+    @classmethod
+    def load_current(cls, path=DEMAND_STATS_FILE, data_dir="data"):
+        """Load the store and sync it with the sales files, saving it again if it was stale"""
+        store = cls.load_or_build(path, data_dir)
+        store, changed = store.sync_with_sales(data_dir)
+        if changed:
+            store.save(path)
+        return store
+
+    @classmethod
+    def load_or_build(cls, path=DEMAND_STATS_FILE, data_dir="data"):
+        """Load the persisted store, building and saving it from the sales history if missing"""
+        if os.path.exists(path):
+            return cls.load(path)
+        store = cls.build_from_sales(data_dir)
+        store.save(path)
+        return store
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Maintain running demand statistics per (client, sku)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Rebuild the store from all sales_daily_*.csv files")
+    build_parser.add_argument('--data-dir', default="data")
+
+    append_parser = subparsers.add_parser('append', help="Apply new sales records to the store")
+    append_parser.add_argument('sales_file', help="CSV with date, sku, qty_sold (and client_id unless --client)")
+    append_parser.add_argument('--client', default=None, help="Client id for a single-client sales file")
+
+    parser.add_argument('--store', default=DEMAND_STATS_FILE, help="Store file")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        store = DemandStatsStore.build_from_sales(args.data_dir)
+        store.save(args.store)
+        print(f"✔ Built demand statistics for {len(store)} series: {args.store}")
+        return
+
+    store = DemandStatsStore.load_or_build(args.store)
+    sales_df = pd.read_csv(args.sales_file)
+    if args.client is not None:
+        sales_df['client_id'] = args.client
+    applied = store.append_sales(sales_df)
+    # Records applied by hand are not in the sales files, so the next sync rebuilds from them
+    store.sources = {}
+    store.save(args.store)
+    print(f"✔ Applied {applied} daily records to {len(store)} series: {args.store}")
+
+
+if __name__ == '__main__':
+    main()
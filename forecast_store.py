@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+FORECAST_HORIZON_DIR = "data/forecast_horizon"
+HORIZON_COLUMNS = ['yhat', 'yhat_lower', 'yhat_upper']
+INDEX_FILE = "index.csv"
+
+
+# ----------------------------
+# WRITER
+# ----------------------------
+class ForecastHorizonWriter:
+    """Collects daily forecast horizons per (client, sku) and saves them as float32 column files"""
+
+    def __init__(self, horizon_days):
+        self.horizon_days = horizon_days
+        self.keys = []
+        self.start_dates = []
+        self.columns = {column: [] for column in HORIZON_COLUMNS}
+
+    def add(self, client_id, sku, forecast_df):
+        """Add one series' future forecast frame (ds, yhat, yhat_lower, yhat_upper)"""
+        forecast_df = forecast_df.iloc[:self.horizon_days]
+        for column in HORIZON_COLUMNS:
+            values = np.full(self.horizon_days, np.nan, dtype=np.float32)
+            values[:len(forecast_df)] = forecast_df[column].to_numpy(dtype=np.float32)
+            self.columns[column].append(values)
+        self.keys.append((client_id, sku))
+        self.start_dates.append(pd.Timestamp(forecast_df['ds'].iloc[0]).date())
+
+    def save(self, path=FORECAST_HORIZON_DIR):
+        """Write one .npy file per column plus a (client_id, sku) -> row index"""
+        os.makedirs(path, exist_ok=True)
+        for column, rows in self.columns.items():
+            matrix = np.vstack(rows) if rows else np.empty((0, self.horizon_days), dtype=np.float32)
+            np.save(os.path.join(path, f"{column}.npy"), matrix)
+
+        index_df = pd.DataFrame(self.keys, columns=['client_id', 'sku'])
+        index_df['row'] = np.arange(len(index_df))
+        index_df['start_date'] = self.start_dates
+        index_df.to_csv(os.path.join(path, INDEX_FILE), index=False)
+        return len(index_df)
+
+
+# ----------------------------
+# READER
+# ----------------------------
+class ForecastHorizonStore:
+    """Memory-mapped read access to the daily forecast horizon of every (client, sku)"""
+
+    def __init__(self, path=FORECAST_HORIZON_DIR):
+        index_df = pd.read_csv(os.path.join(path, INDEX_FILE), parse_dates=['start_date'])
+        self.rows = dict(zip(zip(index_df['client_id'], index_df['sku']), index_df['row']))
+        self.start_dates = index_df['start_date'].to_numpy()
+        self.columns = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+            for column in HORIZON_COLUMNS
+        }
+        self.horizon_days = self.columns['yhat'].shape[1]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get_array(self, client_id, sku, column='yhat'):
+        """Daily values of one column for a series, as a read-only view into the mapped file"""
+        return self.columns[column][self.rows[(client_id, sku)]]
+
+    def get(self, client_id, sku):
+        """Daily forecast for a series as a DataFrame (ds, yhat, yhat_lower, yhat_upper)"""
+        row = self.rows[(client_id, sku)]
+        forecast_df = pd.DataFrame({
+            'ds': pd.date_range(self.start_dates[row], periods=self.horizon_days, freq='D')
+        })
+        for column, matrix in self.columns.items():
+            forecast_df[column] = matrix[row]
+        return forecast_df
@@ -0,0 +1,243 @@
+import argparse
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from hijri_converter import Hijri, Gregorian # type: ignore
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+ISLAMIC_HOLIDAYS_CACHE_FILE = "data/islamic_holidays.csv"
+
+# (holiday, Hijri month, Hijri day, lower_window, upper_window)
+ISLAMIC_HOLIDAYS = [
+    ('Eid_ul_Fitr', 10, 1, -3, 3),      # Shawwal 1
+    ('Eid_ul_Adha', 12, 10, -3, 3),     # Dhu al-Hijjah 10
+    ('Ramadan_Start', 9, 1, 0, 29),     # Ramadan 1
+    ('Eid_Milad', 3, 12, 0, 1),         # Rabi' al-awwal 12
+    ('Ashura', 1, 10, 0, 1),            # Muharram 10
+    ('Shab_e_Barat', 8, 15, 0, 1),      # Sha'ban 15
+    ('Shab_e_Qadr', 9, 27, 0, 1),       # Ramadan 27
+]
+
+# (holiday, month, day, lower_window, upper_window)
+FIXED_HOLIDAYS = [
+    ('Independence_Day', 8, 14, 0, 1),
+    ('Quaid_e_Azam_Day', 12, 25, 0, 1),
+    ('Pakistan_Day', 3, 23, 0, 1),
+    ('Labour_Day', 5, 1, 0, 1),
+    ('Iqbal_Day', 11, 9, 0, 1),
+]
+
+CALENDAR_COLUMNS = ['holiday', 'ds', 'lower_window', 'upper_window']
+
+
+# ----------------------------
+# HIJRI CONVERSION
+# ----------------------------
+@lru_cache(maxsize=None)
+def hijri_to_gregorian(hijri_year, hijri_month, hijri_day):
+    """Gregorian date of a Hijri date, or None if it cannot be converted"""
+    try:
+        return Hijri(hijri_year, hijri_month, hijri_day).to_gregorian()
+    except Exception as e:
+        print(f"⚠️  Error converting Hijri date {hijri_year}/{hijri_month}/{hijri_day}: {e}")
+        return None
+
+
+def hijri_year(value):
+    """Hijri year containing a Gregorian date"""
+    value = pd.Timestamp(value)
+    return Gregorian(value.year, value.month, value.day).to_hijri().year
+
+
+def islamic_holidays_for_years(hijri_years):
+    """Islamic holidays for the given Hijri years"""
+    rows = []
+    for year in hijri_years:
+        for holiday, month, day, lower_window, upper_window in ISLAMIC_HOLIDAYS:
+            gregorian_date = hijri_to_gregorian(year, month, day)
+            if gregorian_date:
+                rows.append({
+                    'holiday': holiday,
+                    'hijri_year': year,
+                    'ds': pd.Timestamp(gregorian_date.isoformat()),
+                    'lower_window': lower_window,
+                    'upper_window': upper_window
+                })
+    holidays = pd.DataFrame(rows, columns=['holiday', 'hijri_year', 'ds', 'lower_window', 'upper_window'])
+    return holidays.astype({'hijri_year': np.int64, 'ds': 'datetime64[ns]', 'lower_window': np.int64, 'upper_window': np.int64})
+
+
+def load_islamic_holidays(hijri_years, cache_file=ISLAMIC_HOLIDAYS_CACHE_FILE):
+    """Islamic holidays for the given Hijri years, converting only years missing from the disk cache"""
+    hijri_years = sorted(set(hijri_years))
+    if cache_file and os.path.exists(cache_file):
+        cached = pd.read_csv(cache_file, parse_dates=['ds'])
+    else:
+        cached = islamic_holidays_for_years([])
+
+    missing = [year for year in hijri_years if year not in set(cached['hijri_year'])]
+    if missing:
+        cached = pd.concat([cached, islamic_holidays_for_years(missing)], ignore_index=True)
+        cached = cached.sort_values(['hijri_year', 'ds', 'holiday'], ignore_index=True)
+        if cache_file:
+            cached.to_csv(cache_file, index=False)
+
+    return cached[cached['hijri_year'].isin(hijri_years)]
+
+
+def fixed_holidays_for_years(years):
+    """Fixed-date Gregorian holidays for the given years"""
+    rows = [
+        {
+            'holiday': holiday,
+            'ds': pd.Timestamp(year, month, day),
+            'lower_window': lower_window,
+            'upper_window': upper_window
+        }
+        for year in years
+        for holiday, month, day, lower_window, upper_window in FIXED_HOLIDAYS
+    ]
+    return pd.DataFrame(rows, columns=CALENDAR_COLUMNS)
+
+
+# ----------------------------
+# HOLIDAY CALENDAR
+# ----------------------------
+@lru_cache(maxsize=None)
+def _holiday_calendar(start, end, cache_file):
+    # Holiday windows can reach into the range from the neighbouring years
+    hijri_years = range(hijri_year(start) - 1, hijri_year(end) + 2)
+    gregorian_years = range(start.year - 1, end.year + 2)
+
+    calendar = pd.concat([
+        load_islamic_holidays(hijri_years, cache_file)[CALENDAR_COLUMNS],
+        fixed_holidays_for_years(gregorian_years)
+    ], ignore_index=True)
+
+    # Keep holidays whose window overlaps the range
+    window_start = calendar['ds'] + pd.to_timedelta(calendar['lower_window'], unit='D')
+    window_end = calendar['ds'] + pd.to_timedelta(calendar['upper_window'], unit='D')
+    in_range = (window_end >= pd.Timestamp(start)) & (window_start <= pd.Timestamp(end))
+    return calendar[in_range].sort_values(['ds', 'holiday'], ignore_index=True)
+
+
+def build_holiday_calendar(start, end, cache_file=ISLAMIC_HOLIDAYS_CACHE_FILE):
+    """Prophet holidays frame (holiday, ds, lower_window, upper_window) for every holiday touching [start, end].
+
+    Memoised per range; Hijri conversions are also cached on disk across runs.
+    """
+    return _holiday_calendar(pd.Timestamp(start).date(), pd.Timestamp(end).date(), cache_file)
+
+
+# ----------------------------
+# PRECOMPUTED HOLIDAY FEATURES
+# ----------------------------
+class HolidayFeatures:
+    """Per-day holiday indicator matrix for a calendar, named like Prophet's holiday features.
+
+    Column '{holiday}_delim_{+/-}{offset}' is 1 on the days `offset` days from an occurrence,
+    for every offset within the holiday's window. Rows cover every day from start to end.
+    """
+
+    def __init__(self, calendar, start, end):
+        self.calendar = calendar
+        self.start = pd.Timestamp(start).normalize()
+        self.end = pd.Timestamp(end).normalize()
+        n_days = (self.end - self.start).days + 1
+
+        # One entry per (holiday occurrence, offset within its window)
+        lower_window = calendar['lower_window'].to_numpy(dtype=np.int64)
+        window_sizes = calendar['upper_window'].to_numpy(dtype=np.int64) - lower_window + 1
+        occurrence = np.repeat(np.arange(len(calendar)), window_sizes)
+        window_starts = np.repeat(np.cumsum(window_sizes) - window_sizes, window_sizes)
+        offsets = np.arange(len(occurrence)) - window_starts + lower_window[occurrence]
+        entries = pd.DataFrame({'holiday': calendar['holiday'].to_numpy()[occurrence], 'offset': offsets})
+        days = (pd.to_datetime(calendar['ds']).to_numpy()[occurrence] - self.start.to_datetime64()).astype('timedelta64[D]')
+        days = days.astype(np.int64) + offsets
+
+        columns = entries.drop_duplicates().reset_index(drop=True)
+        columns['name'] = [
+            f"{holiday}_delim_{'+' if offset >= 0 else '-'}{abs(offset)}"
+            for holiday, offset in zip(columns['holiday'], columns['offset'])
+        ]
+        columns = columns.sort_values('name', ignore_index=True)
+        self.columns = columns['name'].tolist()
+        column_index = pd.MultiIndex.from_frame(columns[['holiday', 'offset']]).get_indexer(
+            pd.MultiIndex.from_frame(entries)
+        )
+
+        # An extra all-zero last row stands in for days outside the range
+        self.matrix = np.zeros((n_days + 1, len(self.columns)))
+        inside = (days >= 0) & (days < n_days)
+        self.matrix[days[inside], column_index[inside]] = 1.0
+        self.holiday_names = list(dict.fromkeys(calendar['holiday']))
+
+    def covers(self, dates):
+        """Whether every date falls within the precomputed range"""
+        dates = pd.to_datetime(dates).dt.normalize()
+        return len(dates) == 0 or (dates.min() >= self.start and dates.max() <= self.end)
+
+    def holiday_dates(self):
+        """Days inside the range that fall within any holiday window"""
+        days = pd.date_range(self.start, self.end, freq='D')
+        return days[self.matrix[:-1].any(axis=1)]
+
+    def indicators(self, dates):
+        """Holiday indicator rows for the given dates as a (len(dates), n_columns) array"""
+        days = (pd.to_datetime(dates).dt.normalize() - self.start).dt.days.to_numpy()
+        outside = (days < 0) | (days >= len(self.matrix) - 1)
+        return self.matrix[np.where(outside, -1, days)]
+
+
+class HolidayFeaturesMixin:
+    """Prophet mixin that takes holiday features from a shared precomputed HolidayFeatures.
+
+    Used when the model's holidays frame is the calendar the features were built from;
+    anything else (country holidays, dates outside the range) falls back to Prophet.
+    """
+
+    def __init__(self, *args, holiday_features=None, **kwargs):
+        self.holiday_features = holiday_features
+        if holiday_features is not None:
+            kwargs.setdefault('holidays', holiday_features.calendar)
+        super().__init__(*args, **kwargs)
+
+    def make_holiday_features(self, dates, holidays):
+        features = self.holiday_features
+        if (
+            features is None or self.holidays is not features.calendar
+            or self.country_holidays is not None or not features.covers(dates)
+        ):
+            return super().make_holiday_features(dates, holidays)
+
+        holiday_features = pd.DataFrame(features.indicators(dates), columns=features.columns)
+        prior_scale_list = [float(self.holidays_prior_scale)] * len(features.columns)
+        holiday_names = list(features.holiday_names)
+        if self.train_holiday_names is None:
+            self.train_holiday_names = pd.Series(holiday_names)
+        return holiday_features, prior_scale_list, holiday_names
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build the Pakistani holiday calendar for a date range")
+    parser.add_argument('start', help="First date (YYYY-MM-DD)")
+    parser.add_argument('end', help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--output', default=None, help="Calendar CSV (default: print)")
+    args = parser.parse_args()
+
+    calendar = build_holiday_calendar(args.start, args.end)
+    if args.output:
+        calendar.to_csv(args.output, index=False)
+        print(f"💾 Saved {len(calendar)} holidays to: {args.output}")
+    else:
+        print(calendar.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
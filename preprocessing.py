@@ -1,47 +1,147 @@
+import argparse
 import pandas as pd
 
-# Load the dataset
-# Ensure the file name matches your local file path
-file_path = 'Grocery_Inventory_and_Sales_Dataset.csv'
-df = pd.read_csv(file_path)
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+INPUT_FILE = 'Grocery_Inventory_and_Sales_Dataset.csv'
+OUTPUT_FILE = 'Processed_Grocery_Data.csv'
+CHUNK_SIZE = 500_000
+EXPIRATION_DATE_FORMAT = '%m/%d/%Y'
 
-# --- Basic Preprocessing ---
+# Only the columns needed for filtering and output are read from disk
+COLUMNS_TO_KEEP = [
+    'Product_Name',
+    'Product_ID',
+    'Expiration_Date',
+    'Stock_Quantity',
+    'Supplier_Name',
+    'Unit_Price'
+]
+READ_COLUMNS = COLUMNS_TO_KEEP + ['Status']
 
-# 1. Clean 'Unit_Price' column
-# Remove '$' and ',' then convert to float for calculations
-df['Unit_Price'] = df['Unit_Price'].astype(str).str.replace('$', '').str.replace(',', '').astype(float)
+# Explicit dtypes so pandas never has to infer types chunk by chunk.
+# Unit_Price and Expiration_Date are read as text and parsed below.
+COLUMN_DTYPES = {
+    'Product_Name': 'string',
+    'Product_ID': 'string',
+    'Expiration_Date': 'string',
+    'Stock_Quantity': 'Int32',
+    'Supplier_Name': 'string',
+    'Unit_Price': 'string',
+    'Status': 'category'
+}
 
-# 2. Convert 'Expiration_Date' to datetime objects
-# errors='coerce' turns unparseable dates into NaT (Not a Time) so we can easily filter them
-df['Expiration_Date'] = pd.to_datetime(df['Expiration_Date'], errors='coerce')
 
-# --- Filtering ---
+# ----------------------------
+# PARSERS
+# ----------------------------
+def parse_unit_price(prices):
+    """Strip '$', ',' and whitespace in a single regex pass and convert to float"""
+    cleaned = prices.str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').astype('float64')
 
-# 3. Remove all 'Discontinued' products
-df_clean = df[df['Status'] != 'Discontinued']
 
-# 4. Remove all products with no expiry dates (where date is NaT/Null)
-df_clean = df_clean.dropna(subset=['Expiration_Date'])
+def parse_expiration_date(dates):
+    """Parse expiration dates with a fixed format (no per-row format inference)"""
+    # errors='coerce' turns unparseable dates into NaT so they can be filtered out
+    return pd.to_datetime(dates, format=EXPIRATION_DATE_FORMAT, errors='coerce')
 
-# --- Column Selection ---
 
-# 5. Keep only the specified columns
-columns_to_keep = [
-    'Product_Name', 
-    'Product_ID', 
-    'Expiration_Date', 
-    'Stock_Quantity', 
-    'Supplier_Name', 
-    'Unit_Price'
-]
-df_clean = df_clean[columns_to_keep]
+# ----------------------------
+# PREPROCESSING
+# ----------------------------
+def clean_chunk(df):
+    """Clean, filter and select columns for one chunk of the raw dataset"""
+    # Remove all 'Discontinued' products before doing any parsing work
+    df = df[df['Status'] != 'Discontinued']
+
+    df = df.assign(
+        Unit_Price=parse_unit_price(df['Unit_Price']),
+        Expiration_Date=parse_expiration_date(df['Expiration_Date'])
+    )
+
+    # Remove all products with no expiry dates (where date is NaT/Null)
+    df = df.dropna(subset=['Expiration_Date'])
+
+    return df[COLUMNS_TO_KEEP]
+
+
+def iter_clean_chunks(file_path=INPUT_FILE, chunk_size=CHUNK_SIZE):
+    """Stream the raw CSV in fixed-size chunks and yield cleaned chunks"""
+    reader = pd.read_csv(
+        file_path,
+        usecols=READ_COLUMNS,
+        dtype=COLUMN_DTYPES,
+        chunksize=chunk_size
+    )
+    for chunk in reader:
+        yield clean_chunk(chunk)
+
+
+def write_csv(chunks, output_path):
+    """Append cleaned chunks to a single CSV file"""
+    rows = 0
+    first = True
+    for chunk in chunks:
+        chunk.to_csv(output_path, index=False, mode='w' if first else 'a', header=first)
+        first = False
+        rows += len(chunk)
+    if first:
+        pd.DataFrame(columns=COLUMNS_TO_KEEP).to_csv(output_path, index=False)
+    return rows
+
+
+def write_parquet(chunks, output_path):
+    """Append cleaned chunks as row groups of a single Parquet file"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def preprocess(file_path=INPUT_FILE, output_path=OUTPUT_FILE, output_format='csv', chunk_size=CHUNK_SIZE):
+    """Run the full preprocessing pipeline in bounded memory, returning the number of rows written"""
+    chunks = iter_clean_chunks(file_path, chunk_size)
+    if output_format == 'csv':
+        return write_csv(chunks, output_path)
+    if output_format == 'parquet':
+        return write_parquet(chunks, output_path)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the grocery inventory dataset")
+    parser.add_argument('--input', default=INPUT_FILE, help="Raw grocery inventory CSV")
+    parser.add_argument('--output', default=None, help="Output file (default depends on --format)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="Output format")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    output_path = args.output
+    if output_path is None:
+        output_path = OUTPUT_FILE if args.format == 'csv' else OUTPUT_FILE.replace('.csv', '.parquet')
 
-# Reset index for a clean dataframe
-df_clean = df_clean.reset_index(drop=True)
+    rows = preprocess(args.input, output_path, args.format, args.chunk_size)
+    print(f"✔ Saved {rows} cleaned rows to: {output_path}")
 
-# Display the first few rows of the cleaned data
-print("Cleaned Data Preview:")
-print(df_clean.head())
 
-# Save the processed data to a new CSV file
-df_clean.to_csv('Processed_Grocery_Data.csv', index=False)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+import numpy as np
+from scipy.optimize import minimize
+from prophet import Prophet
+from prophet.models import IStanBackend
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# L-BFGS settings mirroring cmdstan's optimize defaults
+# (iter=1e4, history_size=5, tol_rel_obj=1e4, tol_grad=1e-8)
+LBFGS_MAX_ITER = 10000
+LBFGS_HISTORY = 5
+LBFGS_FTOL = 1e4 * np.finfo(float).eps
+LBFGS_GTOL = 1e-8
+
+LINEAR_TREND = 0
+FLAT_TREND = 2
+
+
+# ----------------------------
+# PROPHET MAP OBJECTIVE
+# ----------------------------
+class ProphetObjective:
+    """Negative log posterior of Prophet's Stan model (without constants) and its gradient.
+
+    Parameters are packed as [k, m, delta+ (S), delta- (S), log(sigma_obs), beta (K)] with
+    delta = delta+ - delta- and both parts bounded at zero, which turns the Laplace prior's
+    |delta| into a smooth linear term for L-BFGS-B. Like cmdstan's optimizer, sigma_obs is
+    optimised on the log scale without a Jacobian adjustment.
+    """
+
+    def __init__(self, stan_data):
+        self.trend_indicator = int(stan_data['trend_indicator'])
+        if self.trend_indicator not in (LINEAR_TREND, FLAT_TREND):
+            raise ValueError("The NumPy backend supports linear and flat growth only")
+
+        self.t = np.asarray(stan_data['t'], dtype=np.float64)
+        self.y = np.asarray(stan_data['y'], dtype=np.float64)
+        self.T = len(self.y)
+        self.S = int(stan_data['S'])
+        self.K = int(stan_data['K'])
+        self.tau = float(stan_data['tau'])
+
+        X = np.asarray(stan_data['X'], dtype=np.float64).reshape(self.T, self.K)
+        s_a = np.asarray(stan_data['s_a'], dtype=np.float64)
+        s_m = np.asarray(stan_data['s_m'], dtype=np.float64)
+        # Empty feature blocks are skipped (e.g. no additive terms in a multiplicative model)
+        self.X_sa = X * s_a if s_a.any() else None
+        self.X_sm = X * s_m if s_m.any() else None
+        self.inv_sigmas2 = 1.0 / np.asarray(stan_data['sigmas'], dtype=np.float64) ** 2
+
+        # Linear trend: g = k * t + m + B @ delta, with B[i, j] = (t_i - t_change_j) once t_i >= t_change_j
+        t_change = np.asarray(stan_data['t_change'], dtype=np.float64).reshape(self.S)
+        after_change = self.t[:, None] >= t_change[None, :]
+        self.B = np.where(after_change, self.t[:, None] - t_change[None, :], 0.0)
+
+    def unpack(self, theta):
+        S, K = self.S, self.K
+        delta = theta[2:2 + S] - theta[2 + S:2 + 2 * S]
+        return theta[0], theta[1], delta, theta[2 + 2 * S], theta[3 + 2 * S:3 + 2 * S + K]
+
+    def pack(self, k, m, delta, log_sigma, beta):
+        delta = np.ravel(delta)
+        return np.concatenate([
+            [k, m], np.maximum(delta, 0), np.maximum(-delta, 0), [log_sigma], np.ravel(beta)
+        ]).astype(np.float64)
+
+    def bounds(self):
+        """L-BFGS-B bounds: delta+ and delta- are non-negative, everything else is free"""
+        return [(None, None)] * 2 + [(0, None)] * (2 * self.S) + [(None, None)] * (1 + self.K)
+
+    def trend(self, k, m, delta):
+        if self.trend_indicator == FLAT_TREND:
+            return np.full(self.T, m)
+        return k * self.t + m + self.B @ delta
+
+    def __call__(self, theta):
+        """Objective value and gradient for scipy.optimize.minimize(jac=True)"""
+        k, m, delta, log_sigma, beta = self.unpack(theta)
+        delta_abs = theta[2:2 + 2 * self.S].sum()
+        sigma = np.exp(log_sigma)
+
+        g = self.trend(k, m, delta)
+        multiplier = 1.0 if self.X_sm is None else 1.0 + self.X_sm @ beta
+        mu = g * multiplier
+        if self.X_sa is not None:
+            mu = mu + self.X_sa @ beta
+        resid = self.y - mu
+        sse = resid @ resid
+
+        value = (
+            self.T * log_sigma + 0.5 * sse / sigma ** 2
+            + (k ** 2 + m ** 2) / 50.0
+            + delta_abs / self.tau
+            + 2.0 * sigma ** 2
+            + 0.5 * (beta ** 2 * self.inv_sigmas2).sum()
+        )
+
+        # d(value)/d(mu) for the fitted mean mu
+        d_mu = -resid / sigma ** 2
+        d_trend = d_mu * multiplier
+        d_m = d_trend.sum() + m / 25.0
+        d_k = k / 25.0
+        d_delta = np.zeros(self.S)
+        if self.trend_indicator == LINEAR_TREND:
+            d_k += d_trend @ self.t
+            d_delta = self.B.T @ d_trend
+        d_log_sigma = self.T - sse / sigma ** 2 + 4.0 * sigma ** 2
+        d_beta = beta * self.inv_sigmas2
+        if self.X_sa is not None:
+            d_beta = d_beta + self.X_sa.T @ d_mu
+        if self.X_sm is not None:
+            d_beta = d_beta + self.X_sm.T @ (d_mu * g)
+
+        grad = np.concatenate([
+            [d_k, d_m], d_delta + 1.0 / self.tau, 1.0 / self.tau - d_delta, [d_log_sigma], d_beta
+        ])
+        return value, grad
+
+
+# ----------------------------
+# IN-PROCESS BACKEND
+# ----------------------------
+class NumpyLBFGSBackend(IStanBackend):
+    """Prophet backend that finds the MAP estimate in-process with scipy's L-BFGS.
+
+    Replaces the cmdstan subprocess, temp files and CSV parsing of the default backend;
+    MCMC sampling is not supported. Not used by stocknormcalculation until prophet_parity.py
+    passes on the sales data.
+    """
+
+    @staticmethod
+    def get_type():
+        return 'NUMPY'
+
+    def load_model(self):
+        return None
+
+    def fit(self, stan_init, stan_data, **kwargs):
+        objective = ProphetObjective(stan_data)
+        theta0 = objective.pack(
+            stan_init['k'], stan_init['m'], stan_init['delta'],
+            np.log(stan_init['sigma_obs']), stan_init['beta']
+        )
+
+        self.objective = objective
+        self.stan_fit = minimize(
+            objective, theta0, jac=True, method='L-BFGS-B', bounds=objective.bounds(),
+            options={'maxiter': LBFGS_MAX_ITER, 'maxcor': LBFGS_HISTORY, 'ftol': LBFGS_FTOL, 'gtol': LBFGS_GTOL}
+        )
+        k, m, delta, log_sigma, beta = objective.unpack(self.stan_fit.x)
+
+        params = OrderedDict([
+            ('k', np.array([k])),
+            ('m', np.array([m])),
+            ('delta', np.array(delta)),
+            ('sigma_obs', np.array([np.exp(log_sigma)])),
+            ('beta', np.array(beta)),
+            ('trend', objective.trend(k, m, delta))
+        ])
+        for par in params:
+            params[par] = params[par].reshape((1, -1))
+        return params
+
+    def sampling(self, stan_init, stan_data, samples, **kwargs):
+        raise NotImplementedError("The NumPy backend only supports MAP fitting (mcmc_samples=0)")
+
+
+class NumpyProphet(Prophet):
+    """Prophet model fitted with NumpyLBFGSBackend instead of cmdstan"""
+
+    def _load_stan_backend(self, stan_backend):
+        self.stan_backend = NumpyLBFGSBackend()
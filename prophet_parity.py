@@ -0,0 +1,141 @@
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from demand_classifier import classify_demand, daily_demand_series
+from holiday_calendar import HolidayFeatures, build_holiday_calendar
+from prophet_numpy import NumpyProphet
+
+logging.getLogger('prophet').setLevel(logging.ERROR)
+logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+DATA_DIR = "data"
+FORECAST_DAYS = 30
+
+# Model settings of stocknormcalculation's Prophet tier
+MODEL_SETTINGS = dict(
+    daily_seasonality=True,
+    weekly_seasonality=True,
+    yearly_seasonality=True,
+    seasonality_mode='multiplicative',
+    changepoint_prior_scale=0.05,
+    interval_width=0.95
+)
+
+# The NumPy fit passes when its negative log posterior is at most cmdstan's plus
+# OBJECTIVE_TOLERANCE, and its mean forecast is within MEAN_FORECAST_TOLERANCE of cmdstan's
+OBJECTIVE_TOLERANCE = 0.01
+MEAN_FORECAST_TOLERANCE = 0.01
+
+
+# ----------------------------
+# PARITY CHECK
+# ----------------------------
+def fit_both(history, holidays):
+    """Fit one series with cmdstan and the NumPy backend on identical Stan inputs"""
+    fits = {}
+    for name, model_class in [('cmdstan', Prophet), ('numpy', NumpyProphet)]:
+        model = model_class(holidays=holidays, **MODEL_SETTINGS)
+        started = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model.fit(history)
+        elapsed = time.perf_counter() - started
+
+        future = model.make_future_dataframe(periods=FORECAST_DAYS)
+        forecast = model.predict(future)
+        mean_forecast = forecast.loc[forecast['ds'] > history['ds'].max(), 'yhat'].mean()
+        fits[name] = (model, mean_forecast, elapsed)
+    return fits
+
+
+def compare_series(history, holidays):
+    """Objective values at both optima and the relative gap in 30-day mean forecast"""
+    fits = fit_both(history, holidays)
+    cmdstan_model, cmdstan_mean, cmdstan_time = fits['cmdstan']
+    numpy_model, numpy_mean, numpy_time = fits['numpy']
+
+    # Both optima scored with the same objective, so the Stan constants cancel
+    objective = numpy_model.stan_backend.objective
+    params = cmdstan_model.params
+    cmdstan_value = objective(objective.pack(
+        params['k'][0, 0], params['m'][0, 0], params['delta'][0],
+        np.log(params['sigma_obs'][0, 0]), params['beta'][0]
+    ))[0]
+    numpy_value = numpy_model.stan_backend.stan_fit.fun
+
+    scale = max(abs(cmdstan_mean), 1e-9)
+    return {
+        'cmdstan_objective': cmdstan_value,
+        'numpy_objective': numpy_value,
+        'objective_gap': numpy_value - cmdstan_value,
+        'cmdstan_mean': cmdstan_mean,
+        'numpy_mean': numpy_mean,
+        'mean_rel_diff': abs(numpy_mean - cmdstan_mean) / scale,
+        'cmdstan_seconds': cmdstan_time,
+        'numpy_seconds': numpy_time
+    }
+
+
+def run_parity_check(data_dir=DATA_DIR, limit=None):
+    """Compare both backends on every Prophet-tier series in the client sales files"""
+    sales_files = sorted(f for f in os.listdir(data_dir) if f.startswith("sales_daily_C") and f.endswith(".csv"))
+    sales = {f: pd.read_csv(os.path.join(data_dir, f)) for f in sales_files}
+    sales_dates = pd.to_datetime(pd.concat([df['date'] for df in sales.values()]))
+    sales_start, sales_end = sales_dates.min().date(), sales_dates.max().date()
+    calendar_end = sales_end + timedelta(days=FORECAST_DAYS)
+    holidays = build_holiday_calendar(sales_start, calendar_end)
+    holiday_dates = HolidayFeatures(holidays, sales_start, calendar_end).holiday_dates()
+
+    rows = []
+    for sales_file, sales_df in sales.items():
+        client_id = sales_file[len("sales_daily_"):-len(".csv")]
+        classes = classify_demand(sales_df, holiday_dates)
+        for sku in classes.index[classes['forecast_method'] == 'Prophet']:
+            if limit is not None and len(rows) >= limit:
+                return pd.DataFrame(rows)
+            result = compare_series(daily_demand_series(sales_df, sku), holidays)
+            rows.append({'client_id': client_id, 'sku': sku, **result})
+    return pd.DataFrame(rows)
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Check the NumPy Prophet backend against cmdstan on the sales data")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with sales_daily_<client>.csv files")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many series")
+    parser.add_argument('--output', default=None, help="Per-series comparison CSV")
+    args = parser.parse_args()
+
+    results = run_parity_check(args.data_dir, args.limit)
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"💾 Saved comparison to: {args.output}")
+
+    objective_ok = results['objective_gap'] <= OBJECTIVE_TOLERANCE
+    mean_ok = results['mean_rel_diff'] <= MEAN_FORECAST_TOLERANCE
+    print(f"\n📊 Parity Summary ({len(results)} Prophet series):")
+    print(f"  • Objective within {OBJECTIVE_TOLERANCE} of cmdstan: {objective_ok.sum()} "
+          f"(worst gap {results['objective_gap'].max():.4f})")
+    print(f"  • Mean forecast within {MEAN_FORECAST_TOLERANCE:.0%} of cmdstan: {mean_ok.sum()} "
+          f"(worst {results['mean_rel_diff'].max():.2%})")
+    print(f"  • Fit time cmdstan: {results['cmdstan_seconds'].sum():.1f}s, numpy: {results['numpy_seconds'].sum():.1f}s")
+
+    passed = bool((objective_ok & mean_ok).all())
+    print(f"\n{'✔ Parity check passed' if passed else '⚠️  Parity check failed'}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import re
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from stock_positions import STOCK_BATCHES_FILE, load_usable_stock
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+NORMS_FILE = "data/stock_norms_calculated.csv"
+PRODUCTS_FILE = "data/distributor_products.csv"
+PURCHASE_ORDERS_DIR = "data/purchase_orders"
+
+# Supplier terms per category: units per case and minimum order quantity (units)
+DEFAULT_PACK_SIZE = 12
+DEFAULT_MOQ = 24
+PACK_SIZE_BY_CATEGORY = {
+    'Dairy': 12,
+    'Beverages': 24,
+    'Snacks': 24,
+    'Bakery': 12,
+    'Grocery': 12,
+    'Personal_Care': 12,
+    'Household': 12,
+    'Frozen': 6
+}
+MOQ_BY_CATEGORY = {
+    'Dairy': 24,
+    'Beverages': 48,
+    'Snacks': 48,
+    'Bakery': 24,
+    'Grocery': 24,
+    'Personal_Care': 24,
+    'Household': 24,
+    'Frozen': 12
+}
+
+ORDER_COLUMNS = [
+    'po_number', 'brand', 'sku', 'product_name', 'category', 'clients_below_norm', 'total_gap',
+    'pack_size', 'moq', 'order_packs', 'order_qty', 'mrp', 'value_at_mrp', 'order_date'
+]
+
+
+# ----------------------------
+# ORDER CALCULATION
+# ----------------------------
+def sku_gaps(norms_df, stock_df):
+    """Units needed per SKU to bring every client up to its stock norm"""
+    positions = norms_df[['client_id', 'sku', 'stock_norm']].merge(stock_df, on=['client_id', 'sku'], how='left')
+    positions['gap'] = (positions['stock_norm'] - positions['qty_on_hand'].fillna(0)).clip(lower=0)
+    positions['below_norm'] = positions['gap'] > 0
+    return positions.groupby('sku', as_index=False).agg(
+        clients_below_norm=('below_norm', 'sum'),
+        total_gap=('gap', 'sum')
+    )
+
+
+def supplier_terms(products_df, terms_df=None):
+    """Pack size and MOQ per SKU: category defaults, overridden by an optional sku,pack_size,moq table"""
+    terms = products_df[['sku']].copy()
+    terms['pack_size'] = products_df['category'].map(PACK_SIZE_BY_CATEGORY).fillna(DEFAULT_PACK_SIZE)
+    terms['moq'] = products_df['category'].map(MOQ_BY_CATEGORY).fillna(DEFAULT_MOQ)
+    if terms_df is not None:
+        terms = terms.merge(terms_df, on='sku', how='left', suffixes=('', '_override'))
+        for column in ['pack_size', 'moq']:
+            if f'{column}_override' in terms:
+                terms[column] = terms.pop(f'{column}_override').fillna(terms[column])
+    terms[['pack_size', 'moq']] = terms[['pack_size', 'moq']].astype(np.int64)
+    return terms
+
+
+def build_purchase_orders(norms_df, stock_df, products_df, terms_df=None, order_date=None):
+    """Consolidated order lines per SKU, rounded up to whole packs and at least the MOQ"""
+    order_date = order_date or datetime.now().date()
+    orders = sku_gaps(norms_df, stock_df).merge(
+        products_df[['sku', 'product_name', 'brand', 'category', 'mrp']], on='sku', how='inner'
+    ).merge(supplier_terms(products_df, terms_df), on='sku', how='left')
+
+    gap = orders['total_gap'].to_numpy(dtype=np.float64)
+    pack_size = orders['pack_size'].to_numpy()
+    moq_packs = np.ceil(orders['moq'].to_numpy() / pack_size)
+    order_packs = np.ceil(np.round(gap, 6) / pack_size)
+    order_packs = np.where(order_packs > 0, np.maximum(order_packs, moq_packs), 0).astype(np.int64)
+
+    orders['total_gap'] = np.round(gap, 2)
+    orders['order_packs'] = order_packs
+    orders['order_qty'] = order_packs * pack_size
+    orders['value_at_mrp'] = np.round(orders['order_qty'] * orders['mrp'], 2)
+    orders['order_date'] = order_date
+    orders = orders[orders['order_qty'] > 0].sort_values(['brand', 'category', 'product_name'])
+
+    brand_codes = orders['brand'].map(brand_file_name)
+    orders['po_number'] = "PO-" + pd.Timestamp(order_date).strftime('%Y%m%d') + "-" + brand_codes
+    return orders[ORDER_COLUMNS]
+
+
+def brand_file_name(brand):
+    """Brand name reduced to characters that are safe in file names"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', brand).strip('_')
+
+
+def write_purchase_orders(orders_df, output_dir=PURCHASE_ORDERS_DIR):
+    """Write one consolidated order file per brand, returning the file paths"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for (brand, order_date), brand_orders in orders_df.groupby(['brand', 'order_date'], sort=True):
+        date_code = pd.Timestamp(order_date).strftime('%Y%m%d')
+        path = os.path.join(output_dir, f"PO_{brand_file_name(brand)}_{date_code}.csv")
+        brand_orders.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Generate consolidated supplier purchase orders from stock norms")
+    parser.add_argument('--norms', default=NORMS_FILE, help="Calculated stock norms CSV")
+    parser.add_argument('--batches', default=STOCK_BATCHES_FILE, help="Client stock batches CSV")
+    parser.add_argument('--products', default=PRODUCTS_FILE, help="Distributor products CSV")
+    parser.add_argument('--terms', default=None, help="CSV of sku,pack_size,moq overriding the category defaults")
+    parser.add_argument('--as-of', default=None, help="Order date, also used to exclude expired stock (default: today)")
+    parser.add_argument('--output-dir', default=PURCHASE_ORDERS_DIR, help="Directory for per-brand order files")
+    args = parser.parse_args()
+
+    as_of = pd.Timestamp(args.as_of or datetime.now().date())
+    norms_df = pd.read_csv(args.norms, usecols=['client_id', 'sku', 'stock_norm'])
+    stock_df = load_usable_stock(args.batches, as_of)
+    products_df = pd.read_csv(args.products, usecols=['sku', 'product_name', 'brand', 'category', 'mrp'])
+    terms_df = pd.read_csv(args.terms) if args.terms else None
+    print(f"📂 Loaded {len(norms_df)} stock norms for {norms_df['sku'].nunique()} SKUs")
+
+    orders_df = build_purchase_orders(norms_df, stock_df, products_df, terms_df, order_date=as_of.date())
+    paths = write_purchase_orders(orders_df, args.output_dir)
+    print(f"💾 Saved {len(paths)} purchase orders to: {args.output_dir}/")
+
+    print(f"\n📊 Purchase Order Summary:")
+    print(f"  • Order lines: {len(orders_df)}")
+    print(f"  • Units ordered: {orders_df['order_qty'].sum():,}")
+    print(f"  • Order value at MRP: Rs. {orders_df['value_at_mrp'].sum():,.2f}")
+    by_brand = orders_df.groupby('brand')['value_at_mrp'].sum().sort_values(ascending=False)
+    print(f"\n🏷️  Top Brands by Order Value (MRP):")
+    for brand, value in by_brand.head(5).items():
+        print(f"  • {brand}: Rs. {value:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import csv
+import sys
+import time
+import pandas as pd
+from stock_positions import STOCK_BATCHES_FILE, load_usable_stock
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+NORMS_FILE = "data/stock_norms_calculated.csv"
+
+EVENT_COLUMNS = ['timestamp', 'event_type', 'client_id', 'sku', 'qty']
+ALERT_COLUMNS = ['timestamp', 'client_id', 'sku', 'on_hand', 'reorder_point', 'stock_norm', 'suggested_order_qty']
+
+# Position state layout: [on_hand, reorder_point, stock_norm, below_reorder_point]
+ON_HAND, REORDER_POINT, STOCK_NORM, BELOW = range(4)
+
+
+# ----------------------------
+# ALERT ENGINE
+# ----------------------------
+class ReorderAlertEngine:
+    """In-memory (client, sku) stock positions that raise an alert when on-hand crosses the reorder point.
+
+    Each event is one dict lookup and a few arithmetic operations, so the cost per event does
+    not depend on the size of the stock or norm tables.
+    """
+
+    def __init__(self, norms_df, stock_df):
+        on_hand = dict(zip(zip(stock_df['client_id'], stock_df['sku']), stock_df['qty_on_hand']))
+        self.positions = {}
+        for client_id, sku, rop, stock_norm in zip(
+            norms_df['client_id'], norms_df['sku'], norms_df['reorder_point'], norms_df['stock_norm']
+        ):
+            qty = float(on_hand.get((client_id, sku), 0))
+            self.positions[(client_id, sku)] = [qty, float(rop), float(stock_norm), qty <= rop]
+
+        self.events_processed = 0
+        self.unknown_events = 0
+        self.malformed_events = 0
+        self.oversold_units = 0.0
+        self.alerts_raised = 0
+
+    def initial_alerts(self, timestamp):
+        """Alerts for positions that are already at or below their reorder point"""
+        for (client_id, sku), position in self.positions.items():
+            if position[BELOW]:
+                self.alerts_raised += 1
+                yield self._alert(timestamp, client_id, sku, position)
+
+    def apply(self, timestamp, event_type, client_id, sku, qty):
+        """Apply one sale or receipt event, returning an alert row if the reorder point was crossed.
+
+        Sales beyond the stock on hand leave it at zero; the excess is counted in oversold_units.
+        """
+        self.events_processed += 1
+        if event_type not in ('sale', 'receipt'):
+            self.malformed_events += 1
+            return None
+        position = self.positions.get((client_id, sku))
+        if position is None:
+            self.unknown_events += 1
+            return None
+
+        if event_type == 'sale':
+            position[ON_HAND] -= qty
+            if position[ON_HAND] < 0:
+                self.oversold_units -= position[ON_HAND]
+                position[ON_HAND] = 0.0
+        else:
+            position[ON_HAND] += qty
+
+        if position[ON_HAND] <= position[REORDER_POINT]:
+            if not position[BELOW]:
+                position[BELOW] = True
+                self.alerts_raised += 1
+                return self._alert(timestamp, client_id, sku, position)
+        else:
+            # Re-arm once stock is back above the reorder point
+            position[BELOW] = False
+        return None
+
+    def process(self, rows):
+        """Apply a stream of parsed event rows, yielding alerts as they happen.
+
+        Rows without exactly five fields or with a non-numeric quantity are counted in
+        malformed_events and skipped.
+        """
+        apply = self.apply
+        for row in rows:
+            if not row or row[0] == 'timestamp':
+                continue
+            try:
+                timestamp, event_type, client_id, sku, qty = row
+                qty = float(qty)
+            except ValueError:
+                self.malformed_events += 1
+                continue
+            alert = apply(timestamp, event_type, client_id, sku, qty)
+            if alert is not None:
+                yield alert
+
+    @staticmethod
+    def _alert(timestamp, client_id, sku, position):
+        on_hand = position[ON_HAND]
+        return [
+            timestamp, client_id, sku, round(on_hand, 2), position[REORDER_POINT], position[STOCK_NORM],
+            round(max(position[STOCK_NORM] - on_hand, 0), 2)
+        ]
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Raise reorder alerts from a stream of sale/receipt events")
+    parser.add_argument('events', nargs='?', default='-',
+                        help="Events CSV (timestamp,event_type,client_id,sku,qty); '-' reads stdin")
+    parser.add_argument('--norms', default=NORMS_FILE, help="Calculated stock norms CSV")
+    parser.add_argument('--batches', default=STOCK_BATCHES_FILE, help="Stock batches CSV")
+    parser.add_argument('--as-of', default=None, help="Date for excluding expired batches (default: today)")
+    parser.add_argument('--output', default=None, help="Alerts CSV (default: stdout)")
+    parser.add_argument('--initial', action='store_true',
+                        help="Also alert on positions already at or below the reorder point")
+    args = parser.parse_args()
+
+    norms_df = pd.read_csv(args.norms, usecols=['client_id', 'sku', 'reorder_point', 'stock_norm'])
+    stock_df = load_usable_stock(args.batches, args.as_of)
+    engine = ReorderAlertEngine(norms_df, stock_df)
+    print(f"✔ Loaded {len(engine.positions)} stock positions", file=sys.stderr)
+
+    events = sys.stdin if args.events == '-' else open(args.events, newline='')
+    output = sys.stdout if args.output is None else open(args.output, 'w', newline='')
+    writer = csv.writer(output)
+    writer.writerow(ALERT_COLUMNS)
+
+    started = time.perf_counter()
+    try:
+        if args.initial:
+            writer.writerows(engine.initial_alerts(args.as_of or pd.Timestamp.now().isoformat()))
+        for alert in engine.process(csv.reader(events)):
+            writer.writerow(alert)
+            output.flush()
+    finally:
+        if events is not sys.stdin:
+            events.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+
+    rate = engine.events_processed / elapsed if elapsed > 0 else 0
+    print(f"✔ Processed {engine.events_processed} events in {elapsed:.2f}s ({rate:,.0f} events/s)", file=sys.stderr)
+    print(f"🔔 Alerts raised: {engine.alerts_raised}", file=sys.stderr)
+    if engine.unknown_events:
+        print(f"⚠️  Events for unknown (client, sku): {engine.unknown_events}", file=sys.stderr)
+    if engine.malformed_events:
+        print(f"⚠️  Malformed events skipped: {engine.malformed_events}", file=sys.stderr)
+    if engine.oversold_units:
+        print(f"⚠️  Units sold beyond stock on hand: {engine.oversold_units:,.2f}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
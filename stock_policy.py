@@ -0,0 +1,225 @@
+import argparse
+import itertools
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+SERVICE_LEVEL = 0.95
+DEFAULT_LEAD_TIME_DAYS = 3
+SAFETY_BUFFER_MULTIPLIER = 1.2
+MIN_STOCK_NORM = 10
+ORDER_CYCLE_DAYS = 7
+
+# Lead-time overrides; client overrides take precedence over category overrides
+LEAD_TIME_BY_CATEGORY = {}
+LEAD_TIME_BY_CLIENT = {}
+
+FORECASTS_FILE = "data/demand_forecasts.csv"
+NORMS_FILE = "data/stock_norms_calculated.csv"
+SCENARIOS_FILE = "data/stock_norm_scenarios.csv"
+
+NORM_COLUMNS = [
+    'client_id', 'sku', 'product_name', 'brand', 'category',
+    'avg_daily_demand', 'std_demand', 'coefficient_of_variation', 'lead_time_days',
+    'safety_stock', 'lead_time_demand', 'reorder_point', 'stock_norm', 'optimal_order_qty',
+    'forecast_method', 'demand_pattern', 'service_level', 'z_score', 'last_updated'
+]
+
+
+# ----------------------------
+# POLICY CALCULATION
+# ----------------------------
+def resolve_lead_times(forecasts_df, lead_time=DEFAULT_LEAD_TIME_DAYS, by_category=None, by_client=None):
+    """Lead time per forecast row: client override, then category override, then the default"""
+    lead_times = pd.Series(lead_time, index=forecasts_df.index, dtype='float64')
+    if by_category:
+        lead_times = forecasts_df['category'].map(by_category).fillna(lead_times)
+    if by_client:
+        lead_times = forecasts_df['client_id'].map(by_client).fillna(lead_times)
+    return lead_times
+
+
+def calculate_stock_norms(forecasts_df, service_level=SERVICE_LEVEL, lead_time=DEFAULT_LEAD_TIME_DAYS,
+                          safety_buffer=SAFETY_BUFFER_MULTIPLIER, min_stock_norm=MIN_STOCK_NORM,
+                          lead_time_by_category=None, lead_time_by_client=None, last_updated=None):
+    """Turn forecast-stage output into stock norms for one set of policy parameters"""
+    z_score = stats.norm.ppf(service_level)
+    lead_times = resolve_lead_times(forecasts_df, lead_time, lead_time_by_category, lead_time_by_client)
+
+    avg_demand = forecasts_df['avg_demand'].to_numpy(dtype=np.float64)
+    std_demand = forecasts_df['std_demand'].to_numpy(dtype=np.float64)
+    lead_time_days = lead_times.to_numpy()
+    max_shelf_life = forecasts_df['max_shelf_life'].fillna(365).to_numpy()
+
+    safety_stock = z_score * std_demand * np.sqrt(lead_time_days)
+    lead_time_demand = avg_demand * lead_time_days
+    rop = lead_time_demand + safety_stock
+    stock_norm = rop * safety_buffer
+
+    # Never hold more than can be sold before short-lived products expire
+    stock_norm = np.where(
+        max_shelf_life < 90, np.minimum(stock_norm, avg_demand * np.minimum(max_shelf_life * 0.7, 60)), stock_norm
+    )
+    stock_norm = np.where(
+        max_shelf_life < 30, np.minimum(stock_norm, avg_demand * np.minimum(max_shelf_life * 0.5, 20)), stock_norm
+    )
+    stock_norm = np.maximum(stock_norm, min_stock_norm)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(avg_demand > 0, std_demand / avg_demand, 0)
+
+    norms_df = pd.DataFrame({
+        'client_id': forecasts_df['client_id'].to_numpy(),
+        'sku': forecasts_df['sku'].to_numpy(),
+        'product_name': forecasts_df['product_name'].to_numpy(),
+        'brand': forecasts_df['brand'].to_numpy(),
+        'category': forecasts_df['category'].to_numpy(),
+        'avg_daily_demand': np.round(avg_demand, 2),
+        'std_demand': np.round(std_demand, 2),
+        'coefficient_of_variation': np.round(cv, 2),
+        'lead_time_days': lead_times.to_numpy(),
+        'safety_stock': np.round(safety_stock, 2),
+        'lead_time_demand': np.round(lead_time_demand, 2),
+        'reorder_point': np.round(rop, 2),
+        'stock_norm': np.round(stock_norm, 2),
+        'optimal_order_qty': np.round(avg_demand * ORDER_CYCLE_DAYS, 2),
+        'forecast_method': forecasts_df['forecast_method'].to_numpy(),
+        'demand_pattern': forecasts_df['demand_pattern'].to_numpy(),
+        'service_level': service_level,
+        'z_score': round(z_score, 2),
+        'last_updated': last_updated or datetime.now().date()
+    })
+
+    # Whole-day lead times are written as integers, matching the original output
+    if (norms_df['lead_time_days'] % 1 == 0).all():
+        norms_df['lead_time_days'] = norms_df['lead_time_days'].astype(int)
+
+    return norms_df.sort_values(['client_id', 'category', 'product_name'])[NORM_COLUMNS]
+
+
+def run_scenarios(forecasts_df, scenarios, lead_time_by_category=None, lead_time_by_client=None):
+    """Evaluate several policy scenarios against the same forecasts, returning one stacked table"""
+    results = []
+    for scenario in scenarios:
+        norms_df = calculate_stock_norms(
+            forecasts_df,
+            service_level=scenario['service_level'],
+            lead_time=scenario['lead_time_days'],
+            safety_buffer=scenario['safety_buffer_multiplier'],
+            min_stock_norm=scenario['min_stock_norm'],
+            lead_time_by_category=lead_time_by_category,
+            lead_time_by_client=lead_time_by_client
+        )
+        norms_df.insert(0, 'scenario', scenario['scenario'])
+        results.append(norms_df)
+    return pd.concat(results, ignore_index=True)
+
+
+# ----------------------------
+# COMMAND LINE
+# ----------------------------
+def parse_override(value):
+    """argparse type for one KEY=DAYS lead-time override"""
+    key, _, number = value.partition('=')
+    try:
+        days = float(number)
+    except ValueError:
+        days = None
+    if not key or days is None:
+        raise argparse.ArgumentTypeError(f"expected KEY=DAYS, got: {value!r}")
+    return key, days
+
+
+def build_scenarios(args):
+    """Scenarios from a CSV file, or the grid of all command-line parameter values"""
+    if args.scenarios:
+        scenarios_df = pd.read_csv(args.scenarios)
+        defaults = {
+            'service_level': SERVICE_LEVEL,
+            'lead_time_days': DEFAULT_LEAD_TIME_DAYS,
+            'safety_buffer_multiplier': SAFETY_BUFFER_MULTIPLIER,
+            'min_stock_norm': MIN_STOCK_NORM
+        }
+        for column, default in defaults.items():
+            if column not in scenarios_df:
+                scenarios_df[column] = default
+        if 'scenario' not in scenarios_df:
+            scenarios_df['scenario'] = [f"S{i + 1}" for i in range(len(scenarios_df))]
+        return scenarios_df.to_dict('records')
+
+    grid = itertools.product(args.service_level, args.lead_time, args.safety_buffer, args.min_stock_norm)
+    return [
+        {
+            'scenario': f"SL{service_level}_LT{lead_time}_SB{safety_buffer}_MIN{min_stock_norm}",
+            'service_level': service_level,
+            'lead_time_days': lead_time,
+            'safety_buffer_multiplier': safety_buffer,
+            'min_stock_norm': min_stock_norm
+        }
+        for service_level, lead_time, safety_buffer, min_stock_norm in grid
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompute stock norms from saved demand forecasts without refitting any model"
+    )
+    parser.add_argument('--forecasts', default=FORECASTS_FILE, help="Forecast-stage output CSV")
+    parser.add_argument('--output', default=None, help="Output CSV (norms file, or scenario table for sweeps)")
+    parser.add_argument('--service-level', type=float, nargs='+', default=[SERVICE_LEVEL])
+    parser.add_argument('--lead-time', type=float, nargs='+', default=[DEFAULT_LEAD_TIME_DAYS])
+    parser.add_argument('--safety-buffer', type=float, nargs='+', default=[SAFETY_BUFFER_MULTIPLIER])
+    parser.add_argument('--min-stock-norm', type=float, nargs='+', default=[MIN_STOCK_NORM])
+    parser.add_argument('--category-lead-time', action='append', type=parse_override, metavar='CATEGORY=DAYS',
+                        help="Lead time override for a product category (repeatable)")
+    parser.add_argument('--client-lead-time', action='append', type=parse_override, metavar='CLIENT=DAYS',
+                        help="Lead time override for a client (repeatable)")
+    parser.add_argument('--scenarios', default=None,
+                        help="CSV of scenarios (scenario, service_level, lead_time_days, "
+                             "safety_buffer_multiplier, min_stock_norm)")
+    args = parser.parse_args()
+
+    forecasts_df = pd.read_csv(args.forecasts)
+    lead_time_by_category = {**LEAD_TIME_BY_CATEGORY, **dict(args.category_lead_time or [])}
+    lead_time_by_client = {**LEAD_TIME_BY_CLIENT, **dict(args.client_lead_time or [])}
+    scenarios = build_scenarios(args)
+
+    print(f"📂 Loaded {len(forecasts_df)} forecasts from: {args.forecasts}")
+
+    if len(scenarios) == 1:
+        scenario = scenarios[0]
+        norms_df = calculate_stock_norms(
+            forecasts_df,
+            service_level=scenario['service_level'],
+            lead_time=scenario['lead_time_days'],
+            safety_buffer=scenario['safety_buffer_multiplier'],
+            min_stock_norm=scenario['min_stock_norm'],
+            lead_time_by_category=lead_time_by_category,
+            lead_time_by_client=lead_time_by_client
+        )
+        output_file = args.output or NORMS_FILE
+        norms_df.to_csv(output_file, index=False)
+        print(f"💾 Saved {len(norms_df)} stock norms to: {output_file}")
+        return
+
+    results = run_scenarios(forecasts_df, scenarios, lead_time_by_category, lead_time_by_client)
+    output_file = args.output or SCENARIOS_FILE
+    results.to_csv(output_file, index=False)
+    print(f"💾 Saved {len(scenarios)} scenarios to: {output_file}")
+
+    print(f"\n📊 Scenario Comparison:")
+    summary = results.groupby('scenario', sort=False).agg(
+        total_stock_norm=('stock_norm', 'sum'),
+        avg_stock_norm=('stock_norm', 'mean'),
+        avg_reorder_point=('reorder_point', 'mean'),
+        avg_safety_stock=('safety_stock', 'mean')
+    ).round(2)
+    print(summary.to_string())
+
+
+if __name__ == '__main__':
+    main()
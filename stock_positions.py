@@ -0,0 +1,23 @@
+from datetime import datetime
+import pandas as pd
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+STOCK_BATCHES_FILE = "data/stock_batches.csv"
+
+
+# ----------------------------
+# USABLE STOCK
+# ----------------------------
+def load_usable_stock(file_path=STOCK_BATCHES_FILE, as_of=None):
+    """Usable (non-expired) quantity on hand per (client, sku) as of a date (default: today)"""
+    batches = pd.read_csv(
+        file_path,
+        usecols=['client_id', 'sku', 'qty_on_hand', 'exp_date'],
+        parse_dates=['exp_date']
+    )
+    as_of = pd.Timestamp(as_of or datetime.now().date())
+
+    usable = batches[(batches['exp_date'] > as_of) & (batches['qty_on_hand'] > 0)]
+    return usable.groupby(['client_id', 'sku'], as_index=False)['qty_on_hand'].sum()
@@ -1,12 +1,21 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from scipy import stats
 from prophet import Prophet
-from hijri_converter import Hijri, Gregorian # type: ignore
 import os
 import warnings
 import logging
+from demand_classifier import (
+    classify_demand, daily_demand_series, forecast_moving_average, forecast_croston,
+    flat_forecast_frame
+)
+from forecast_store import FORECAST_HORIZON_DIR, ForecastHorizonWriter
+from demand_stats import DEMAND_STATS_FILE, DemandStatsStore
+from holiday_calendar import ISLAMIC_HOLIDAYS, HolidayFeatures, HolidayFeaturesMixin, build_holiday_calendar
+from stock_policy import (
+    SERVICE_LEVEL, DEFAULT_LEAD_TIME_DAYS, SAFETY_BUFFER_MULTIPLIER,
+    LEAD_TIME_BY_CATEGORY, LEAD_TIME_BY_CLIENT, calculate_stock_norms
+)
 
 # Suppress Prophet/cmdstanpy verbose logging
 logging.getLogger('prophet').setLevel(logging.ERROR)
@@ -16,132 +25,10 @@ warnings.filterwarnings('ignore')
 # ----------------------------
 # CONFIGURATION
 # ----------------------------
-SERVICE_LEVEL = 0.95
+# Policy parameters live in stock_policy so norms can be recomputed without refitting
 Z_SCORE = stats.norm.ppf(SERVICE_LEVEL)
-DEFAULT_LEAD_TIME_DAYS = 3
-SAFETY_BUFFER_MULTIPLIER = 1.2
-MIN_STOCK_NORM = 10
 FORECAST_DAYS = 30
-
-# ----------------------------
-# DYNAMIC PAKISTANI HOLIDAYS CALCULATOR
-# ----------------------------
-def get_current_hijri_year():
-    """Get current Hijri year dynamically"""
-    today_gregorian = Gregorian.today()
-    today_hijri = today_gregorian.to_hijri()
-    return today_hijri.year
-
-def islamic_to_gregorian_dynamic(hijri_year, hijri_month, hijri_day):
-    """Convert Islamic date to Gregorian date dynamically"""
-    try:
-        hijri_date = Hijri(hijri_year, hijri_month, hijri_day)
-        gregorian_date = hijri_date.to_gregorian()
-        return f"{gregorian_date.year}-{gregorian_date.month:02d}-{gregorian_date.day:02d}"
-    except Exception as e:
-        print(f"⚠️  Error converting Hijri date {hijri_year}/{hijri_month}/{hijri_day}: {e}")
-        return None
-
-def get_islamic_holidays_dynamic():
-    """Generate Islamic holidays dynamically for current and next Hijri years"""
-    current_hijri = get_current_hijri_year()
-    holidays = []
-    
-    # Generate for current Hijri year and next 2 years to cover forecast period
-    for year_offset in range(0, 3):
-        hijri_year = current_hijri + year_offset
-        
-        # Eid-ul-Fitr (Shawwal 1 - 10th month)
-        eid_fitr_date = islamic_to_gregorian_dynamic(hijri_year, 10, 1)
-        if eid_fitr_date:
-            holidays.append({
-                'holiday': 'Eid_ul_Fitr',
-                'ds': eid_fitr_date,
-                'lower_window': -3,
-                'upper_window': 3
-            })
-        
-        # Eid-ul-Adha (Dhu al-Hijjah 10 - 12th month)
-        eid_adha_date = islamic_to_gregorian_dynamic(hijri_year, 12, 10)
-        if eid_adha_date:
-            holidays.append({
-                'holiday': 'Eid_ul_Adha',
-                'ds': eid_adha_date,
-                'lower_window': -3,
-                'upper_window': 3
-            })
-        
-        # Ramadan Start (Ramadan 1 - 9th month)
-        ramadan_start_date = islamic_to_gregorian_dynamic(hijri_year, 9, 1)
-        if ramadan_start_date:
-            holidays.append({
-                'holiday': 'Ramadan_Start',
-                'ds': ramadan_start_date,
-                'lower_window': 0,
-                'upper_window': 29
-            })
-        
-        # Eid Milad-un-Nabi (Rabi' al-awwal 12 - 3rd month)
-        eid_milad_date = islamic_to_gregorian_dynamic(hijri_year, 3, 12)
-        if eid_milad_date:
-            holidays.append({
-                'holiday': 'Eid_Milad',
-                'ds': eid_milad_date,
-                'lower_window': 0,
-                'upper_window': 1
-            })
-        
-        # Ashura (Muharram 10 - 1st month)
-        ashura_date = islamic_to_gregorian_dynamic(hijri_year, 1, 10)
-        if ashura_date:
-            holidays.append({
-                'holiday': 'Ashura',
-                'ds': ashura_date,
-                'lower_window': 0,
-                'upper_window': 1
-            })
-        
-        # Shab-e-Barat (Sha'ban 15 - 8th month)
-        shab_e_barat_date = islamic_to_gregorian_dynamic(hijri_year, 8, 15)
-        if shab_e_barat_date:
-            holidays.append({
-                'holiday': 'Shab_e_Barat',
-                'ds': shab_e_barat_date,
-                'lower_window': 0,
-                'upper_window': 1
-            })
-        
-        # Shab-e-Qadr (Ramadan 27 - 9th month)
-        shab_e_qadr_date = islamic_to_gregorian_dynamic(hijri_year, 9, 27)
-        if shab_e_qadr_date:
-            holidays.append({
-                'holiday': 'Shab_e_Qadr',
-                'ds': shab_e_qadr_date,
-                'lower_window': 0,
-                'upper_window': 1
-            })
-    
-    return holidays
-
-# Get current Hijri and Gregorian years
-current_hijri_year = get_current_hijri_year()
-current_gregorian_year = datetime.now().year
-
-# Generate dynamic Islamic holidays
-all_holidays = get_islamic_holidays_dynamic()
-
-# Add fixed Gregorian holidays for current and next 2 years
-for year_offset in range(0, 3):
-    year = current_gregorian_year + year_offset
-    all_holidays.extend([
-        {'holiday': 'Independence_Day', 'ds': f'{year}-08-14', 'lower_window': 0, 'upper_window': 1},
-        {'holiday': 'Quaid_e_Azam_Day', 'ds': f'{year}-12-25', 'lower_window': 0, 'upper_window': 1},
-        {'holiday': 'Pakistan_Day', 'ds': f'{year}-03-23', 'lower_window': 0, 'upper_window': 1},
-        {'holiday': 'Labour_Day', 'ds': f'{year}-05-01', 'lower_window': 0, 'upper_window': 1},
-        {'holiday': 'Iqbal_Day', 'ds': f'{year}-11-09', 'lower_window': 0, 'upper_window': 1},
-    ])
-
-PAKISTANI_HOLIDAYS = pd.DataFrame(all_holidays)
+FORECASTS_FILE = "data/demand_forecasts.csv"
 
 print("="*70)
 print("STOCK NORM CALCULATION SYSTEM WITH PROPHET FORECASTING")
@@ -153,13 +40,6 @@ print(f"  • Default Lead Time: {DEFAULT_LEAD_TIME_DAYS} days")
 print(f"  • Safety Buffer Multiplier: {SAFETY_BUFFER_MULTIPLIER}x")
 print(f"  • Forecast Horizon: {FORECAST_DAYS} days")
 print(f"  • Using Prophet with DYNAMIC Islamic calendar")
-print(f"  • Current Hijri Year: {current_hijri_year} AH")
-print(f"  • Current Gregorian Year: {current_gregorian_year} CE")
-print(f"\n📅 Dynamic Islamic Holidays Calculated:")
-islamic_holidays_only = [h for h in all_holidays if h['holiday'] in ['Eid_ul_Fitr', 'Eid_ul_Adha', 'Ramadan_Start', 'Eid_Milad', 'Ashura', 'Shab_e_Barat', 'Shab_e_Qadr']]
-for holiday in islamic_holidays_only[:7]:  # Show first 7 (current year)
-    print(f"  • {holiday['holiday']}: {holiday['ds']}")
-print(f"\n  Total Holidays Loaded: {len(all_holidays)}")
 print("="*70 + "\n")
 
 # ----------------------------
@@ -177,33 +57,63 @@ print(f"✔ Loaded {len(clients_df)} clients")
 
 # Get list of all client sales files
 client_sales_files = [f for f in os.listdir("data") if f.startswith("sales_daily_C") and f.endswith(".csv")]
-print(f"✔ Found {len(client_sales_files)} client sales files\n")
+print(f"✔ Found {len(client_sales_files)} client sales files")
+
+# Running per-(client, sku) demand statistics, synced with the sales files before use
+demand_stats = DemandStatsStore.load_current(DEMAND_STATS_FILE)
+print(f"✔ Loaded demand statistics for {len(demand_stats)} series")
+
+# ----------------------------
+# PAKISTANI HOLIDAY CALENDAR
+# Covers the full sales history plus the forecast horizon
+# ----------------------------
+sales_dates = pd.to_datetime(pd.concat(
+    [pd.read_csv(os.path.join("data", f), usecols=['date'])['date'] for f in client_sales_files]
+    or [pd.Series(dtype=object)]
+))
+if len(sales_dates) > 0:
+    sales_start, sales_end = sales_dates.min().date(), sales_dates.max().date()
+else:
+    # No sales history yet: cover the forecast horizon from today
+    sales_start = sales_end = datetime.now().date()
+calendar_end = sales_end + timedelta(days=FORECAST_DAYS)
+PAKISTANI_HOLIDAYS = build_holiday_calendar(sales_start, calendar_end)
+# Holiday features expanded once and shared by every Prophet fit
+HOLIDAY_FEATURES = HolidayFeatures(PAKISTANI_HOLIDAYS, sales_start, calendar_end)
+HOLIDAY_DATES = HOLIDAY_FEATURES.holiday_dates()
+
+print(f"\n📅 Holiday Calendar: {sales_start} to {calendar_end}")
+islamic_names = [holiday[0] for holiday in ISLAMIC_HOLIDAYS]
+islamic_holidays_only = PAKISTANI_HOLIDAYS[PAKISTANI_HOLIDAYS['holiday'].isin(islamic_names)]
+for _, holiday in islamic_holidays_only.tail(7).iterrows():  # Show the 7 most recent
+    print(f"  • {holiday['holiday']}: {holiday['ds'].date()}")
+print(f"  Total Holidays Loaded: {len(PAKISTANI_HOLIDAYS)}\n")
 
 # ----------------------------
 # PROPHET DEMAND FORECASTING FUNCTION
 # ----------------------------
-def forecast_demand_with_prophet(sales_df, sku, forecast_days=FORECAST_DAYS):
+class CalendarProphet(HolidayFeaturesMixin, Prophet):
+    """Prophet reusing the precomputed holiday features"""
+
+
+def forecast_demand_with_prophet(sales_df, sku, forecast_days=FORECAST_DAYS, history=None):
     """Use Prophet to forecast future demand for a SKU"""
-    sku_sales = sales_df[sales_df['sku'] == sku].copy()
-    
-    if len(sku_sales) < 14:
+    if (sales_df['sku'] == sku).sum() < 14:
         return None
     
-    sku_sales['ds'] = pd.to_datetime(sku_sales['date'])
-    sku_sales['y'] = sku_sales['qty_sold']
-    
-    prophet_df = sku_sales.groupby('ds')['y'].sum().reset_index()
+    prophet_df = daily_demand_series(sales_df, sku)
     
-    date_range = pd.date_range(start=prophet_df['ds'].min(), end=prophet_df['ds'].max(), freq='D')
-    prophet_df = prophet_df.set_index('ds').reindex(date_range, fill_value=0).reset_index()
-    prophet_df.columns = ['ds', 'y']
+    # Historical mean/std from the running statistics store when available
+    if history is None:
+        history = {'mean': prophet_df['y'].mean(), 'std': prophet_df['y'].std()}
     
     try:
-        model = Prophet(
+        model = CalendarProphet(
             daily_seasonality=True,
             weekly_seasonality=True,
             yearly_seasonality=True,
             holidays=PAKISTANI_HOLIDAYS,
+            holiday_features=HOLIDAY_FEATURES,
             seasonality_mode='multiplicative',
             changepoint_prior_scale=0.05,
             interval_width=0.95
@@ -230,79 +140,59 @@ def forecast_demand_with_prophet(sales_df, sku, forecast_days=FORECAST_DAYS):
             forecasted_std_demand = forecasted_avg_demand * 0.3
         
         if forecasted_avg_demand <= 0:
-            forecasted_avg_demand = prophet_df['y'].mean()
+            forecasted_avg_demand = history['mean']
         
         return {
             'avg_demand': forecasted_avg_demand,
             'std_demand': forecasted_std_demand,
             'forecast_df': future_forecast,
-            'historical_avg': prophet_df['y'].mean(),
+            'historical_avg': history['mean'],
             'forecast_method': 'Prophet'
         }
         
     except Exception as e:
         print(f"    ⚠️  Prophet failed, using fallback: {str(e)[:50]}")
         return {
-            'avg_demand': prophet_df['y'].mean(),
-            'std_demand': prophet_df['y'].std(),
+            'avg_demand': history['mean'],
+            'std_demand': history['std'],
             'forecast_df': None,
-            'historical_avg': prophet_df['y'].mean(),
+            'historical_avg': history['mean'],
             'forecast_method': 'Fallback'
         }
 
 # ----------------------------
-# STOCK NORM CALCULATION FUNCTION
+# MODEL TIER DISPATCH
 # ----------------------------
-def calculate_stock_norm(sales_df, sku, product_info, lead_time=DEFAULT_LEAD_TIME_DAYS):
-    """Calculate stock norm for a specific SKU using Prophet forecasting"""
-    forecast_result = forecast_demand_with_prophet(sales_df, sku)
-    
-    if forecast_result is None:
-        return None
-    
-    avg_demand = forecast_result['avg_demand']
-    std_demand = forecast_result['std_demand']
-    forecast_method = forecast_result['forecast_method']
-    
-    safety_stock = Z_SCORE * std_demand * np.sqrt(lead_time)
-    lead_time_demand = avg_demand * lead_time
-    rop = lead_time_demand + safety_stock
-    stock_norm = rop * SAFETY_BUFFER_MULTIPLIER
-    
-    if product_info is not None:
-        max_shelf_life = product_info.get('max_shelf_life', 365)
-        
-        if max_shelf_life < 90:
-            max_feasible_stock = avg_demand * min(max_shelf_life * 0.7, 60)
-            stock_norm = min(stock_norm, max_feasible_stock)
-        
-        if max_shelf_life < 30:
-            max_feasible_stock = avg_demand * min(max_shelf_life * 0.5, 20)
-            stock_norm = min(stock_norm, max_feasible_stock)
-    
-    stock_norm = max(stock_norm, MIN_STOCK_NORM)
-    
-    order_cycle_days = 7
-    optimal_order_qty = avg_demand * order_cycle_days
-    
-    return {
-        'avg_daily_demand': round(avg_demand, 2),
-        'std_demand': round(std_demand, 2),
-        'coefficient_of_variation': round(std_demand / avg_demand if avg_demand > 0 else 0, 2),
-        'lead_time_days': lead_time,
-        'safety_stock': round(safety_stock, 2),
-        'lead_time_demand': round(lead_time_demand, 2),
-        'reorder_point': round(rop, 2),
-        'stock_norm': round(stock_norm, 2),
-        'optimal_order_qty': round(optimal_order_qty, 2),
-        'forecast_method': forecast_method,
-        'historical_avg': round(forecast_result['historical_avg'], 2)
-    }
+def forecast_demand(sales_df, sku, forecast_method='Prophet', forecast_days=FORECAST_DAYS, history=None):
+    """Forecast demand for a SKU with the model tier chosen by the demand classifier"""
+    if forecast_method == 'Prophet':
+        result = forecast_demand_with_prophet(sales_df, sku, forecast_days, history)
+        if result is None or result['forecast_df'] is not None:
+            return result
+        daily = daily_demand_series(sales_df, sku)
+    elif forecast_method == 'SMA':
+        daily = daily_demand_series(sales_df, sku)
+        result = forecast_moving_average(daily['y'])
+    elif forecast_method in ('Croston', 'SBA'):
+        daily = daily_demand_series(sales_df, sku)
+        result = forecast_croston(daily['y'], sba=forecast_method == 'SBA')
+    else:
+        raise ValueError(f"Unknown forecast method: {forecast_method}")
+    
+    if history is not None:
+        result['historical_avg'] = history['mean']
+    
+    # Tiers without a daily curve (including the Prophet fallback) get a flat horizon
+    result['forecast_df'] = flat_forecast_frame(
+        daily['ds'].iloc[-1], result['avg_demand'], result['std_demand'], forecast_days
+    )
+    return result
 
 # ----------------------------
 # PROCESS ALL CLIENTS
 # ----------------------------
-all_norms = []
+all_forecasts = []
+horizon_writer = ForecastHorizonWriter(FORECAST_DAYS)
 today = datetime.now().date()
 
 print("🔄 Processing clients...\n")
@@ -323,6 +213,9 @@ for sales_file in client_sales_files:
         continue
     
     unique_skus = sales_df['sku'].unique()
+    
+    # Route each SKU to the cheapest adequate forecast model in one vectorised pass
+    demand_classes = classify_demand(sales_df, HOLIDAY_DATES)
     processed_count = 0
     total_skus = len(unique_skus)
     
@@ -337,45 +230,58 @@ for sales_file in client_sales_files:
         
         product_info = product_info.iloc[0].to_dict()
         
-        norm_data = calculate_stock_norm(sales_df, sku, product_info)
+        forecast_method = demand_classes.at[sku, 'forecast_method']
+        if forecast_method is None:
+            continue
         
-        if norm_data is None:
+        history = demand_stats.summary(client_id, sku)
+        forecast_result = forecast_demand(sales_df, sku, forecast_method, history=history)
+        
+        if forecast_result is None:
             continue
         
-        norm_record = {
+        forecast_record = {
             'client_id': client_id,
             'sku': sku,
             'product_name': product_info['product_name'],
             'brand': product_info['brand'],
             'category': product_info['category'],
-            'avg_daily_demand': norm_data['avg_daily_demand'],
-            'std_demand': norm_data['std_demand'],
-            'coefficient_of_variation': norm_data['coefficient_of_variation'],
-            'lead_time_days': norm_data['lead_time_days'],
-            'safety_stock': norm_data['safety_stock'],
-            'lead_time_demand': norm_data['lead_time_demand'],
-            'reorder_point': norm_data['reorder_point'],
-            'stock_norm': norm_data['stock_norm'],
-            'optimal_order_qty': norm_data['optimal_order_qty'],
-            'forecast_method': norm_data['forecast_method'],
-            'service_level': SERVICE_LEVEL,
-            'z_score': round(Z_SCORE, 2),
-            'last_updated': today
+            'max_shelf_life': product_info.get('max_shelf_life', 365),
+            'avg_demand': forecast_result['avg_demand'],
+            'std_demand': forecast_result['std_demand'],
+            'historical_avg': forecast_result['historical_avg'],
+            'forecast_method': forecast_result['forecast_method'],
+            'demand_pattern': demand_classes.at[sku, 'demand_pattern'],
+            'forecast_date': today
         }
         
-        all_norms.append(norm_record)
+        all_forecasts.append(forecast_record)
+        horizon_writer.add(client_id, sku, forecast_result['forecast_df'])
         processed_count += 1
     
     print(f"✔ Processed {processed_count} SKUs")
 
-print(f"\n✔ Total norms calculated: {len(all_norms)}\n")
+print(f"\n✔ Total forecasts calculated: {len(all_forecasts)}\n")
 
 # ----------------------------
 # SAVE RESULTS
 # ----------------------------
-if len(all_norms) > 0:
-    norms_df = pd.DataFrame(all_norms)
-    norms_df = norms_df.sort_values(['client_id', 'category', 'product_name'])
+if len(all_forecasts) > 0:
+    # Forecast-stage artifact: policy what-ifs rerun from this file via stock_policy.py
+    forecasts_df = pd.DataFrame(all_forecasts)
+    forecasts_df.to_csv(FORECASTS_FILE, index=False)
+    print(f"💾 Saved demand forecasts to: {FORECASTS_FILE}")
+    
+    # Daily horizon per series, memory-mapped by downstream tools via forecast_store.ForecastHorizonStore
+    horizon_writer.save(FORECAST_HORIZON_DIR)
+    print(f"💾 Saved {FORECAST_DAYS}-day forecast horizons to: {FORECAST_HORIZON_DIR}/")
+    
+    norms_df = calculate_stock_norms(
+        forecasts_df,
+        lead_time_by_category=LEAD_TIME_BY_CATEGORY,
+        lead_time_by_client=LEAD_TIME_BY_CLIENT,
+        last_updated=today
+    )
     
     output_file = "data/stock_norms_calculated.csv"
     norms_df.to_csv(output_file, index=False)
@@ -394,8 +300,14 @@ if len(all_norms) > 0:
     print(f"  • Unique Clients: {norms_df['client_id'].nunique()}")
     print(f"  • Unique SKUs: {norms_df['sku'].nunique()}")
     print(f"  • Prophet Forecasts: {len(norms_df[norms_df['forecast_method']=='Prophet'])}")
+    print(f"  • Moving Average (SMA): {len(norms_df[norms_df['forecast_method']=='SMA'])}")
+    print(f"  • Croston / SBA: {len(norms_df[norms_df['forecast_method'].isin(['Croston', 'SBA'])])}")
     print(f"  • Fallback Method: {len(norms_df[norms_df['forecast_method']=='Fallback'])}")
     
+    print(f"\n🧮 Demand Patterns:")
+    for pattern, count in norms_df['demand_pattern'].value_counts().items():
+        print(f"  • {pattern}: {count}")
+    
     print(f"\n📈 Demand Statistics:")
     print(f"  • Average Daily Demand (mean): {norms_df['avg_daily_demand'].mean():.2f}")
     print(f"  • Average Daily Demand (median): {norms_df['avg_daily_demand'].median():.2f}")
@@ -453,11 +365,12 @@ if len(all_norms) > 0:
     print("="*70)
     print(f"\n💡 Next Steps:")
     print(f"  1. Review calculated stock norms in: {output_file}")
-    print("  2. Stock norms include Prophet-based demand forecasting")
+    print("  2. Stock norms use Prophet, moving-average or Croston forecasts by demand pattern")
     print("  3. Considers Pakistani holidays and seasonality")
     print("  4. Use for automated reorder point alerts")
     print("  5. Integrate with redistribution logic")
     print("  6. Re-run monthly to update with latest sales data")
+    print(f"  7. Try other service levels / lead times: python stock_policy.py --service-level 0.97 --lead-time 5")
     print("="*70 + "\n")
     
 else: